@@ -15,6 +15,11 @@ const cafeSchema = new mongoose.Schema({
     required: true,
     index: true,
   },
+  // Trimmed, case-folded city written by the scraper, so city lookups are exact index matches
+  cityKey: {
+    type: String,
+    index: true,
+  },
   neighborhood: {
     type: String,
     default: '',
@@ -179,6 +184,16 @@ const cafeSchema = new mongoose.Schema({
     type: Date,
     default: Date.now,
   },
+  // Set by incremental scrapes when a café no longer shows up in provider results
+  retired: {
+    type: Boolean,
+    default: false,
+    index: true,
+  },
+  retiredAt: Date,
+  contentFingerprint: String,
+  // New reviews per day, estimated by the scraper's refresh daemon
+  reviewVelocity: Number,
 }, {
   timestamps: true,
   collection: 'cafes',
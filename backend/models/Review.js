@@ -80,6 +80,8 @@ const reviewSchema = new mongoose.Schema({
     type: String,
   }],
   url: String,
+  // sourceId of an earlier review of the same café that this one nearly duplicates (set by the scraper)
+  duplicateOf: String,
   date: {
     type: Date,
     default: Date.now,
@@ -35,7 +35,7 @@ router.get('/', [
       sort = 'workabilityScore',
     } = req.query;
 
-    let query = {};
+    let query = { retired: { $ne: true } };
 
     // Text search
     if (q) {
@@ -105,7 +105,8 @@ router.get('/', [
 // GET /api/cafes/:id - Get single café
 router.get('/:id', async (req, res) => {
   try {
-    const cafe = await Cafe.findById(req.params.id)
+    // Soft-retired cafés are hidden here too, as in the list endpoint
+    const cafe = await Cafe.findOne({ _id: req.params.id, retired: { $ne: true } })
       .populate({
         path: 'reviews',
         options: { sort: { date: -1 }, limit: 20 },
@@ -0,0 +1,422 @@
+"""
+Benchmarks for the scraper's hot paths.
+
+Runs each hot function over checked-in fixtures (Google/Yelp payloads in ``fixtures/cities``
+and a review corpus in ``fixtures/reviews.json``) against an in-memory mongomock database,
+reports throughput, and compares it with a stored baseline so regressions stand out.
+Throughput depends on the machine, so the baseline is not checked in: record one with
+``--save-baseline`` on the machine you compare on, and again whenever a benchmark or fixture
+changes.
+
+Usage (from the scraper directory):
+
+    python benchmarks/bench.py                    # run everything, compare with baseline.json
+    python benchmarks/bench.py --only sentiment   # run benchmarks whose name contains "sentiment"
+    python benchmarks/bench.py --save-baseline    # record this machine's numbers as the baseline
+    python benchmarks/bench.py --check            # exit 1 if anything regressed
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+try:
+    import mongomock
+except ImportError:  # pragma: no cover - depends on the local environment
+    sys.exit("❌ Benchmarks need mongomock: pip install -r benchmarks/requirements.txt")
+
+import scraper  # noqa: E402
+
+FIXTURES = os.path.join(HERE, "fixtures")
+DEFAULT_BASELINE = os.path.join(HERE, "baseline.json")
+DEFAULT_TOLERANCE = 0.2
+CORPUS_SIZES = (100, 500, 2000)
+# Copies of the large city's candidates used for the merge/skip benchmarks
+MERGE_COPIES = 40
+
+# Benchmarks return ``(items processed, unit)`` from a zero-argument run function
+Benchmark = Callable[[], Callable[[], Tuple[int, str]]]
+
+
+# ----------------------------------------------------------------------
+# Fixtures
+# ----------------------------------------------------------------------
+
+
+def load_json(*parts: str):
+    with open(os.path.join(FIXTURES, *parts), encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+class FixtureResponse:
+    def __init__(self, payload: Dict, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers: Dict[str, str] = {}
+
+    def json(self) -> Dict:
+        # Callers mutate payloads (Yelp reviews are attached in place), so hand out copies
+        return copy.deepcopy(self._payload)
+
+
+class FixtureSession:
+    """Stands in for ``requests.Session``, answering provider URLs from a city fixture."""
+
+    def __init__(self, fixture: Dict):
+        self.fixture = fixture
+
+    def get(self, url: str, params: Optional[Dict] = None, headers=None, timeout=None):
+        params = params or {}
+        google, yelp = self.fixture["google"], self.fixture["yelp"]
+        if "textsearch" in url:
+            token = params.get("pagetoken")
+            pages = google["textsearch"]
+            index = 0 if token is None else int(token.rsplit("-", 1)[1]) // 20
+            return FixtureResponse(pages[index])
+        if "place/details" in url:
+            payload = google["details"].get(params.get("place_id"))
+            return FixtureResponse(payload or {"status": "NOT_FOUND"})
+        if url.endswith("/businesses/search"):
+            return FixtureResponse(yelp["search"])
+        business_id = url.rstrip("/").split("/businesses/", 1)[1]
+        if business_id.endswith("/reviews"):
+            payload = yelp["reviews"].get(business_id[: -len("/reviews")])
+        else:
+            payload = yelp["business"].get(business_id)
+        return FixtureResponse(payload or {}, 200 if payload else 404)
+
+
+def make_scraper() -> scraper.CafeScraper:
+    with contextlib.redirect_stdout(io.StringIO()):
+        instance = scraper.CafeScraper(mongo_uri="mongodb://localhost/lattelink_bench", nlp_workers=1)
+    instance.google_api_key = instance.yelp_api_key = "fixture"
+    return instance
+
+
+def fixture_candidates(
+    instance: scraper.CafeScraper, name: str
+) -> Tuple[List[scraper.Candidate], List[scraper.Candidate]]:
+    """Normalised (Google, Yelp) candidates for a city fixture."""
+    fixture = load_json("cities", f"{name}.json")
+    google = [
+        instance.normalize_google_place(payload["result"])
+        for payload in fixture["google"]["details"].values()
+    ]
+    yelp = [
+        instance.normalize_yelp_business(
+            {**business, "reviews_payload": fixture["yelp"]["reviews"][business_id]["reviews"]}
+        )
+        for business_id, business in fixture["yelp"]["business"].items()
+    ]
+    return [c for c in google if c], [c for c in yelp if c]
+
+
+def corpus(size: int) -> List[str]:
+    texts = load_json("reviews.json")
+    return [texts[i % len(texts)] for i in range(size)]
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+
+
+def bench_sentiment(size: int) -> Benchmark:
+    def setup():
+        instance = make_scraper()
+        texts = corpus(size)
+
+        def run():
+            for text in texts:
+                instance.analyze_review_sentiment(text)
+            return len(texts), "reviews"
+
+        return run
+
+    return setup
+
+
+def bench_sentiment_batch(size: int) -> Benchmark:
+    def setup():
+        texts = corpus(size)
+
+        def run():
+            scraper.analyze_reviews_batch(texts)
+            return len(texts), "reviews"
+
+        return run
+
+    return setup
+
+
+def _scored_reviews(instance: scraper.CafeScraper) -> List[List[scraper.Review]]:
+    google, yelp = fixture_candidates(instance, "large")
+    instance.attach_sentiment([candidate.reviews for candidate in google + yelp])
+    return [candidate.reviews for candidate in google + yelp]
+
+
+def bench_score_amenities() -> Benchmark:
+    def setup():
+        instance = make_scraper()
+        cafes = _scored_reviews(instance)
+
+        def run():
+            for reviews in cafes:
+                instance.score_amenities(reviews)
+            return len(cafes), "cafés"
+
+        return run
+
+    return setup
+
+
+def bench_score_city() -> Benchmark:
+    def setup():
+        instance = make_scraper()
+        cafes = _scored_reviews(instance) * 10
+        candidates = [scraper.Candidate(rating_sources={"google": 4.2}) for _ in cafes]
+        sentiment_lists = [[review.sentiment for review in reviews] for reviews in cafes]
+
+        def run():
+            instance.score_city(candidates, sentiment_lists)
+            return len(cafes), "cafés"
+
+        return run
+
+    return setup
+
+
+def bench_review_clusters() -> Benchmark:
+    def setup():
+        instance = make_scraper()
+        google, yelp = fixture_candidates(instance, "large")
+        cafes = instance.merge_candidates(google, yelp, max_results=len(google) + len(yelp))
+        # Texts, sites and authors per café, as ``attach_sentiment`` passes them
+        review_sets = [
+            (
+                [review.text for review in cafe.reviews],
+                [review.source for review in cafe.reviews],
+                [review.author for review in cafe.reviews],
+            )
+            for cafe in cafes
+        ]
+
+        def run():
+            for texts, sources, authors in review_sets:
+                scraper.review_clusters(texts, sources=sources, authors=authors)
+            return sum(len(texts) for texts, _, _ in review_sets), "reviews"
+
+        return run
+
+    return setup
+
+
+def _replicated_candidates(
+    instance: scraper.CafeScraper,
+) -> Tuple[List[scraper.Candidate], List[scraper.Candidate]]:
+    google, yelp = fixture_candidates(instance, "large")
+    google_copies: List[scraper.Candidate] = []
+    yelp_copies: List[scraper.Candidate] = []
+    for copy_index in range(MERGE_COPIES):
+        # Shift each copy far enough away that copies never resolve to each other
+        offset = copy_index * 0.5
+        for source, target, id_field in ((google, google_copies, "google_maps_id"), (yelp, yelp_copies, "yelp_id")):
+            for candidate in source:
+                replica = candidate.copy()
+                replica.lat = candidate.lat + offset
+                setattr(replica, id_field, f"{getattr(candidate, id_field)}-{copy_index}")
+                replica.address = f"{candidate.address} #{copy_index}"
+                target.append(replica)
+    return google_copies, yelp_copies
+
+
+def bench_merge_candidates() -> Benchmark:
+    def setup():
+        instance = make_scraper()
+        google, yelp = _replicated_candidates(instance)
+
+        def run():
+            # Merging folds duplicates into the first candidate in place, so start from copies
+            instance.merge_candidates(
+                [c.copy() for c in google], [c.copy() for c in yelp], max_results=len(google) + len(yelp)
+            )
+            return len(google) + len(yelp), "candidates"
+
+        return run
+
+    return setup
+
+
+def bench_should_skip() -> Benchmark:
+    def setup():
+        instance = make_scraper()
+        google, yelp = _replicated_candidates(instance)
+        candidates = google + yelp
+
+        def run():
+            for candidate in candidates:
+                instance.should_skip_candidate(candidate)
+            return len(candidates), "candidates"
+
+        return run
+
+    return setup
+
+
+def bench_process_cafe() -> Benchmark:
+    def setup():
+        instance = make_scraper()
+        google, yelp = fixture_candidates(instance, "large")
+        cafes = instance.merge_candidates(google, yelp, max_results=len(google) + len(yelp))
+
+        def run():
+            for cafe in cafes:
+                instance.process_cafe(cafe, cafe.reviews, "Seattle")
+            return len(cafes), "cafés"
+
+        return run
+
+    return setup
+
+
+def bench_scrape_city(name: str) -> Benchmark:
+    def setup():
+        fixture = load_json("cities", f"{name}.json")
+
+        def run():
+            # A fresh scraper per run so the in-memory sentiment memo starts cold
+            instance = make_scraper()
+            instance.session = FixtureSession(fixture)
+            summary = instance.scrape_city(fixture["city"], max_results=100)
+            return summary["saved"], "cafés"
+
+        return run
+
+    return setup
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    **{f"sentiment[{size}]": bench_sentiment(size) for size in CORPUS_SIZES},
+    f"sentiment_batch[{CORPUS_SIZES[-1]}]": bench_sentiment_batch(CORPUS_SIZES[-1]),
+    "score_amenities": bench_score_amenities(),
+    "score_city": bench_score_city(),
+    "review_clusters": bench_review_clusters(),
+    "merge_candidates": bench_merge_candidates(),
+    "should_skip_candidate": bench_should_skip(),
+    "process_cafe": bench_process_cafe(),
+    "scrape_city[small]": bench_scrape_city("small"),
+    "scrape_city[large]": bench_scrape_city("large"),
+}
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+
+def run_benchmarks(names: List[str], repeat: int) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    for name in names:
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = BENCHMARKS[name]()
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                items, unit = run()
+                timings.append(time.perf_counter() - started)
+        best = min(timings)
+        results[name] = {
+            "items": items,
+            "unit": unit,
+            "seconds": round(best, 6),
+            "throughput": round(items / best, 2) if best > 0 else None,
+        }
+        print(f"⏱️  {name:<24} {items:>6} {unit:<10} {best:8.3f}s  {results[name]['throughput']:>12,.1f} {unit}/s")
+    return results
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Print throughput against the baseline and return the names that regressed."""
+    regressions = []
+    print("\n📊 Compared with baseline:")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get("throughput") or not result["throughput"]:
+            print(f"   {name:<24} (no baseline)")
+            continue
+        change = result["throughput"] / previous["throughput"] - 1
+        marker = "✅"
+        if change < -tolerance:
+            marker = "❌"
+            regressions.append(name)
+        print(f"   {marker} {name:<24} {change:+7.1%}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the scraper hot paths")
+    parser.add_argument("--only", action="append", help="Run benchmarks whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest counts (default 3)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results to --baseline")
+    parser.add_argument("--json", help="Also write results to this file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed throughput drop before a result counts as a regression (default {DEFAULT_TOLERANCE:.0%}%)",
+    )
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 when anything regressed")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if not args.only or any(part in name for part in args.only)]
+    if not names:
+        parser.error("no benchmark matches --only")
+
+    # Stand-ins: in-memory Mongo, and no Google page-token wait since fixtures are ready at once
+    scraper.MongoClient = mongomock.MongoClient
+    scraper.GOOGLE_PAGE_TOKEN_DELAY = 0.0
+
+    results = run_benchmarks(names, max(1, args.repeat))
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+    regressions: List[str] = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle).get("results", {}), args.tolerance)
+    elif not args.save_baseline:
+        print(f"\nℹ️  No baseline at {args.baseline}; record one on this machine with --save-baseline")
+        if args.check:
+            sys.exit(1)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+        print(f"\n💾 Baseline written to {args.baseline}")
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} regression(s): {', '.join(regressions)}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Cross-provider entity resolution for scraped cafés.
+
+Google and Yelp format addresses differently, so the same café rarely shares an exact
+``name|address`` key across providers. Candidates are instead bucketed into grid cells of
+roughly ``radius_m`` on a side, and a new candidate is only compared with those in its own and
+the eight neighbouring cells: close enough on the map and sharing their distinctive name
+tokens means the same place. Each lookup touches a bounded number of cells, so resolving a
+city stays roughly linear in the number of candidates.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from models import Candidate
+
+DEFAULT_MATCH_RADIUS_M = 75.0
+# Share of the shorter name's distinctive tokens that must appear in the other name
+DEFAULT_NAME_OVERLAP = 0.6
+
+_METERS_PER_DEGREE = 111_320.0
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Words that describe what a place is rather than which place it is
+_GENERIC_TOKENS = frozenset(
+    {
+        "a", "and", "at", "bar", "cafe", "caffe", "co", "coffee", "coffeehouse", "coffeeshop",
+        "company", "espresso", "house", "kitchen", "of", "roasters", "roastery", "roasting",
+        "shop", "the", "tea",
+    }
+)
+
+
+def name_tokens(name: str) -> FrozenSet[str]:
+    """Distinctive lowercase ASCII tokens of a café name ("Café Réveille & Co." -> {"reveille"})."""
+    folded = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    folded = folded.lower().replace("&", " and ").replace("'", "")
+    tokens = frozenset(_TOKEN_PATTERN.findall(folded))
+    # Fall back to every token for names made only of generic words ("The Coffee Shop")
+    return (tokens - _GENERIC_TOKENS) or tokens
+
+
+def distance_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Great-circle distance in metres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    h = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * 6_371_000.0 * math.asin(min(1.0, math.sqrt(h)))
+
+
+class EntityIndex:
+    """Grid index that finds the stored ``models.Candidate`` a new candidate refers to, if any.
+
+    ``merge_candidates`` stores the first candidate seen for each café, which then absorbs its
+    duplicates in place. The index only reads ``name``, ``lat``, ``lng`` and the provider ids.
+    """
+
+    def __init__(
+        self,
+        radius_m: float = DEFAULT_MATCH_RADIUS_M,
+        name_overlap: float = DEFAULT_NAME_OVERLAP,
+    ):
+        self.radius_m = radius_m
+        self.name_overlap = name_overlap
+        self._row_height = radius_m / _METERS_PER_DEGREE
+        # Grid cell -> (name tokens, stored candidate) for every candidate added in that cell
+        self._cells: Dict[Tuple[int, int], List[Tuple[FrozenSet[str], Candidate]]] = {}
+
+    def _row(self, lat: float) -> int:
+        return math.floor(lat / self._row_height)
+
+    def _column(self, row: int, lng: float) -> int:
+        # Columns narrow towards the poles so every cell stays about radius_m wide
+        center = (row + 0.5) * self._row_height
+        width = self._row_height / max(math.cos(math.radians(center)), 0.01)
+        return math.floor(lng / width)
+
+    def add(self, stored: Candidate) -> None:
+        lat, lng = stored.lat, stored.lng
+        if lat is None or lng is None:
+            return
+        row = self._row(lat)
+        cell = (row, self._column(row, lng))
+        self._cells.setdefault(cell, []).append((name_tokens(stored.name), stored))
+
+    def find(self, candidate: Candidate) -> Optional[Candidate]:
+        """Return the closest stored candidate that ``candidate`` duplicates, or ``None``."""
+        lat, lng = candidate.lat, candidate.lng
+        if lat is None or lng is None:
+            return None
+        tokens = name_tokens(candidate.name)
+        if not tokens:
+            return None
+
+        best: Optional[Candidate] = None
+        best_distance = self.radius_m
+        row = self._row(lat)
+        for neighbour_row in (row - 1, row, row + 1):
+            column = self._column(neighbour_row, lng)
+            for neighbour_column in (column - 1, column, column + 1):
+                for stored_tokens, stored in self._cells.get((neighbour_row, neighbour_column), ()):
+                    if not self._names_match(tokens, stored_tokens) or self._ids_conflict(
+                        candidate, stored
+                    ):
+                        continue
+                    distance = distance_m(lat, lng, stored.lat, stored.lng)
+                    if distance <= best_distance:
+                        best, best_distance = stored, distance
+        return best
+
+    def _names_match(self, left: FrozenSet[str], right: FrozenSet[str]) -> bool:
+        if not left or not right:
+            return False
+        return len(left & right) / min(len(left), len(right)) >= self.name_overlap
+
+    @staticmethod
+    def _ids_conflict(candidate: Candidate, stored: Candidate) -> bool:
+        # Two different ids from the same provider are two different places
+        for field in ("google_maps_id", "yelp_id"):
+            ours, theirs = getattr(candidate, field), getattr(stored, field)
+            if ours and theirs and ours != theirs:
+                return True
+        return False
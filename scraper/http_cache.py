@@ -0,0 +1,140 @@
+"""
+On-disk cache for provider API responses.
+
+Payloads are stored zlib-compressed in a single SQLite file, keyed by provider, endpoint,
+URL and normalised query parameters (credentials excluded). Each endpoint has its own TTL,
+and the least recently used entries are evicted once the file grows past a size budget.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+DAY = 24 * 60 * 60
+
+# Seconds a cached payload stays fresh, keyed by "provider:endpoint"
+DEFAULT_TTLS: Dict[str, float] = {
+    "google:geocode": 30 * DAY,
+    "google:textsearch": 1 * DAY,
+    "google:nearbysearch": 1 * DAY,
+    "google:details": 7 * DAY,
+    "yelp:search": 1 * DAY,
+    "yelp:business": 7 * DAY,
+    "yelp:reviews": 3 * DAY,
+}
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Parameters that identify the caller rather than the request
+_IGNORED_PARAMS = {"key"}
+# Re-check the size budget after this many writes rather than on every put
+_EVICTION_INTERVAL = 100
+
+
+class ResponseCache:
+    """Thread-safe SQLite response store; safe to open from several processes at once."""
+
+    def __init__(
+        self,
+        path: str,
+        ttls: Optional[Dict[str, float]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    @staticmethod
+    def make_key(provider: str, endpoint: str, url: str, params: Optional[Dict] = None) -> str:
+        normalized = sorted(
+            (str(name), str(value))
+            for name, value in (params or {}).items()
+            if name not in _IGNORED_PARAMS and value is not None
+        )
+        raw = json.dumps([provider, endpoint, url, normalized], separators=(",", ":"))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, endpoint: str, allow_stale: bool = False) -> Optional[Tuple[int, Dict]]:
+        """Return ``(status, payload)`` for a fresh entry, or any entry when ``allow_stale``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, body, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, body, fetched_at = row
+            now = time.time()
+            if not allow_stale and now - fetched_at > self.ttls.get(endpoint, DAY):
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return status, json.loads(zlib.decompress(body))
+
+    def put(self, key: str, endpoint: str, status: int, payload: Dict) -> None:
+        body = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, status, body, len(body), now, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+            due = self._writes % _EVICTION_INTERVAL == 0
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache is within 90% of its budget."""
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            target = total - int(self.max_bytes * 0.9)
+            freed = removed = 0
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+            ).fetchall()
+            for key, size in rows:
+                if freed >= target:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                freed += size
+                removed += 1
+            self._conn.commit()
+        return removed
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,155 @@
+"""
+MongoDB indexes the scraper's queries depend on, and ``explain()`` checks that they are used.
+
+Every scraper connected to MongoDB calls ``ensure_indexes`` once at start-up. Creating an
+index that already exists is a no-op, so this is cheap after the first run. Cities are
+matched through ``cityKey``, a normalised copy of ``city``. A case-insensitive ``$regex``
+cannot use an index, but an equality on the key can. ``verify_indexes`` (``--verify-indexes``)
+explains each of the scraper's query shapes and reports any that would scan a whole
+collection.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, GEOSPHERE, IndexModel, UpdateOne
+from pymongo.errors import OperationFailure
+
+REQUIRED_INDEXES: Dict[str, List[IndexModel]] = {
+    "cafes": [
+        IndexModel([("googleMapsId", ASCENDING)]),
+        IndexModel([("yelpId", ASCENDING)]),
+        # Every branch of the bulk writer's $or lookup needs an index, or the whole $or scans
+        IndexModel([("name", ASCENDING), ("address", ASCENDING)]),
+        IndexModel([("cityKey", ASCENDING)]),
+        IndexModel([("coordinates", GEOSPHERE)]),
+    ],
+    "reviews": [IndexModel([("cafe", ASCENDING), ("sourceId", ASCENDING)])],
+}
+
+
+def city_key(city: Optional[str]) -> str:
+    """Case- and whitespace-insensitive form of a city name, stored on cafés as ``cityKey``."""
+    return " ".join((city or "").split()).casefold()
+
+
+def ensure_indexes(db) -> List[str]:
+    """Create any missing required index and return the names of the indexes ensured.
+
+    Indexes are created one at a time, so an existing index with conflicting options only
+    skips that index (with a warning) instead of the rest.
+    """
+    ensured: List[str] = []
+    for collection, models in REQUIRED_INDEXES.items():
+        for model in models:
+            try:
+                ensured.extend(db[collection].create_indexes([model]))
+            except OperationFailure as exc:
+                print(f"⚠️  Could not create index {model.document['name']} on {collection}: {exc}")
+    backfill_city_keys(db)
+    return ensured
+
+
+def backfill_city_keys(db) -> int:
+    """Set ``cityKey`` on cafés written before it existed and return how many were updated."""
+    missing = list(db.cafes.find({"cityKey": {"$exists": False}}, {"city": 1}))
+    if not missing:
+        return 0
+    db.cafes.bulk_write(
+        [UpdateOne({"_id": doc["_id"]}, {"$set": {"cityKey": city_key(doc.get("city"))}}) for doc in missing],
+        ordered=False,
+    )
+    print(f"🗂️  Added cityKey to {len(missing)} stored cafés")
+    return len(missing)
+
+
+def plan_stages(plan) -> List[str]:
+    """Every stage name in an explain plan tree, across the classic and SBE plan layouts."""
+    stages: List[str] = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+# cityKey explained when no city is given; the plan doesn't depend on which key is matched
+SAMPLE_CITY_KEY = "sample"
+
+
+def query_shapes(city: Optional[str] = None) -> List[Tuple[str, str, Dict]]:
+    """``(description, collection, filter)`` for each query the scraper sends as data grows."""
+    key = city_key(city) if city else SAMPLE_CITY_KEY
+    cafe_id = ObjectId()
+    return [
+        ("cafés by Google id", "cafes", {"googleMapsId": {"$in": ["sample"]}}),
+        ("cafés by Yelp id", "cafes", {"yelpId": {"$in": ["sample"]}}),
+        (
+            "bulk writer lookup",
+            "cafes",
+            {
+                "$or": [
+                    {"name": "sample", "address": "sample"},
+                    {"googleMapsId": {"$in": ["sample"]}},
+                    {"yelpId": {"$in": ["sample"]}},
+                ]
+            },
+        ),
+        (
+            "incremental sync lookup",
+            "cafes",
+            {
+                "$or": [
+                    {"cityKey": key},
+                    {"googleMapsId": {"$in": ["sample"]}},
+                    {"yelpId": {"$in": ["sample"]}},
+                ]
+            },
+        ),
+        ("stale cafés of a city", "cafes", {"cityKey": key, "_id": {"$nin": [cafe_id]}}),
+        ("refresh queue for a city", "cafes", {"cityKey": {"$in": [key]}, "retired": {"$ne": True}}),
+        (
+            "cafés near a point",
+            "cafes",
+            {
+                "coordinates": {
+                    "$near": {"$geometry": {"type": "Point", "coordinates": [0, 0]}, "$maxDistance": 1000}
+                }
+            },
+        ),
+        ("review upsert", "reviews", {"cafe": cafe_id, "sourceId": "sample"}),
+        ("stale reviews", "reviews", {"cafe": cafe_id, "sourceId": {"$nin": ["sample"]}}),
+        ("stored reviews", "reviews", {"cafe": {"$in": [cafe_id]}, "source": "yelp"}),
+    ]
+
+
+def verify_indexes(db, city: Optional[str] = None) -> List[Dict]:
+    """Explain every query shape and return ``{"query", "collection", "stages", "ok", "error"}``.
+
+    A shape fails when its winning plan contains a ``COLLSCAN``, or when MongoDB cannot plan
+    it at all, as with ``$near`` and no 2dsphere index. ``error`` is then the server's message.
+    """
+    results = []
+    for description, collection, query in query_shapes(city):
+        try:
+            explained = db[collection].find(query).explain()
+        except OperationFailure as exc:
+            stages, error = [], str(exc)
+        else:
+            stages, error = plan_stages(explained.get("queryPlanner", {}).get("winningPlan", {})), None
+        results.append(
+            {
+                "query": description,
+                "collection": collection,
+                "stages": stages,
+                "ok": error is None and "COLLSCAN" not in stages,
+                "error": error,
+            }
+        )
+    return results
@@ -0,0 +1,176 @@
+"""
+Durable run journal for resuming interrupted scrapes.
+
+Each run records its progress in one SQLite file: provider detail payloads by place or
+business id, finished café documents ("staged" entries, keyed by content fingerprint) and the
+cities that have been committed. A run restarted with ``--resume <run-id>`` reuses all of it
+and only redoes the work that was missing. Staged entries are written to the output sink
+when a city is committed at the end of its scrape. A crash before the commit leaves the
+stored city untouched, and an interrupted commit is simply repeated on resume.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Set
+
+from bson import json_util
+from bson.json_util import JSONOptions, JSONMode
+
+from persistence import CafeEntry
+
+# Canonical Extended JSON round-trips datetimes and ObjectIds exactly
+_ENTRY_JSON = JSONOptions(json_mode=JSONMode.CANONICAL, tz_aware=True, tzinfo=timezone.utc)
+
+
+def new_run_id() -> str:
+    return f"{datetime.now(timezone.utc):%Y%m%d-%H%M%S}-{secrets.token_hex(3)}"
+
+
+def journal_path(directory: str, run_id: str) -> str:
+    return os.path.join(directory, f"{run_id}.sqlite")
+
+
+class RunJournal:
+    """Thread-safe journal of one run; several batch worker processes may share the file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.run_id = os.path.splitext(os.path.basename(path))[0]
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL commits stay durable across process crashes without an fsync per fetch
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS fetches (
+                provider TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                PRIMARY KEY (provider, item_id)
+            );
+            CREATE TABLE IF NOT EXISTS staged (
+                city TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                entry TEXT NOT NULL,
+                PRIMARY KEY (city, fingerprint)
+            );
+            CREATE TABLE IF NOT EXISTS cities (city TEXT PRIMARY KEY, summary TEXT NOT NULL);
+            """
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Run metadata
+    # ------------------------------------------------------------------
+
+    def get_meta(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_meta(self, key: str, value) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, json.dumps(value)))
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Provider detail fetches
+    # ------------------------------------------------------------------
+
+    def fetched(self, provider: str, item_id: str) -> Optional[Dict]:
+        """Detail payload recorded for this id by an earlier attempt, or ``None``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM fetches WHERE provider = ? AND item_id = ?", (provider, item_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record_fetch(self, provider: str, item_id: str, payload: Dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fetches VALUES (?, ?, ?)",
+                (provider, item_id, json.dumps(payload, separators=(",", ":"))),
+            )
+            self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Staged documents and commits
+    # ------------------------------------------------------------------
+
+    def staged_fingerprints(self, city: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT fingerprint FROM staged WHERE city = ?", (city,))
+            return {fingerprint for (fingerprint,) in rows}
+
+    def stage(self, city: str, entries: List[CafeEntry]) -> None:
+        """Keep finished documents until the city is committed."""
+        rows = [
+            (
+                city,
+                cafe_doc["contentFingerprint"],
+                json_util.dumps([cafe_doc, review_docs], json_options=_ENTRY_JSON),
+            )
+            for cafe_doc, review_docs in entries
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO staged VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def staged_entries(self, city: str, chunk_size: int) -> Iterator[List[CafeEntry]]:
+        """Staged entries of ``city`` in staging order, ``chunk_size`` at a time."""
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT rowid, entry FROM staged WHERE city = ? AND rowid > ? ORDER BY rowid LIMIT ?",
+                    (city, last_rowid, chunk_size),
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            entries: List[CafeEntry] = []
+            for _, entry in rows:
+                cafe_doc, review_docs = json_util.loads(entry, json_options=_ENTRY_JSON)
+                entries.append((cafe_doc, review_docs))
+            yield entries
+
+    def committed(self, city: str) -> Optional[Dict]:
+        """Summary of ``city`` if an earlier attempt of this run already committed it."""
+        with self._lock:
+            row = self._conn.execute("SELECT summary FROM cities WHERE city = ?", (city,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def commit_city(self, city: str, summary: Dict) -> None:
+        """Mark ``city`` committed and drop its staged documents."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cities VALUES (?, ?)", (city, json.dumps(summary, default=str))
+            )
+            self._conn.execute("DELETE FROM staged WHERE city = ?", (city,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def remove(self) -> None:
+        """Close and delete the journal once the run has finished."""
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.path + suffix)
+            except FileNotFoundError:
+                pass
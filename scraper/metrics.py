@@ -0,0 +1,222 @@
+"""
+Run instrumentation: counters, latency histograms and an optional whole-run profiler.
+
+Counters and histograms are keyed by a metric name plus labels (provider, endpoint, stage,
+...). A snapshot is plain JSON, so batch workers can ship theirs back to the parent to be
+merged, and the totals can be written as a JSON run report or a Prometheus textfile.
+"""
+
+from __future__ import annotations
+
+import bisect
+import cProfile
+import json
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+PROMETHEUS_PREFIX = "lattelink_scraper_"
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict) -> _Key:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+class RunMetrics:
+    """Thread-safe counters and histograms for one scraper (one process)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[_Key, float] = {}
+        # [per-bucket counts..., +Inf count, sum]
+        self._histograms: Dict[_Key, List[float]] = {}
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = _key(name, labels)
+        slot = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0.0] * (len(self.buckets) + 2)
+            histogram[slot] += 1
+            histogram[-1] += seconds
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block, even when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> Dict:
+        """JSON-ready copy of every counter and histogram."""
+        with self._lock:
+            return self._snapshot()
+
+    def drain(self) -> Dict:
+        """Snapshot and reset, so per-job deltas can be shipped to another process."""
+        with self._lock:
+            snapshot = self._snapshot()
+            self._counters.clear()
+            self._histograms.clear()
+        return snapshot
+
+    def _snapshot(self) -> Dict:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in sorted(self._counters.items())
+        ]
+        histograms = [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "buckets": histogram[:-1],
+                "count": sum(histogram[:-1]),
+                "sum": round(histogram[-1], 6),
+            }
+            for (name, labels), histogram in sorted(self._histograms.items())
+        ]
+        return {"bounds": list(self.buckets), "counters": counters, "histograms": histograms}
+
+    def merge(self, snapshot: Dict) -> None:
+        """Add another process's snapshot (taken with the same buckets) into these totals."""
+        with self._lock:
+            for counter in snapshot.get("counters", []):
+                key = _key(counter["name"], counter["labels"])
+                self._counters[key] = self._counters.get(key, 0) + counter["value"]
+            for incoming in snapshot.get("histograms", []):
+                key = _key(incoming["name"], incoming["labels"])
+                histogram = self._histograms.setdefault(key, [0.0] * (len(self.buckets) + 2))
+                for slot, value in enumerate(incoming["buckets"]):
+                    histogram[slot] += value
+                histogram[-1] += incoming["sum"]
+
+    def totals(self, name: str, by: str) -> Dict[str, float]:
+        """Sum a counter, or a histogram's observed seconds, grouped by one label."""
+        grouped: Dict[str, float] = {}
+        with self._lock:
+            for (metric, labels), value in self._counters.items():
+                if metric == name:
+                    group = dict(labels).get(by, "")
+                    grouped[group] = grouped.get(group, 0) + value
+            for (metric, labels), histogram in self._histograms.items():
+                if metric == name:
+                    group = dict(labels).get(by, "")
+                    grouped[group] = grouped.get(group, 0) + histogram[-1]
+        return grouped
+
+    def write_json(self, path: str, **extra) -> None:
+        """Write a run report: ``extra`` fields (summaries, timings) plus the metric snapshot."""
+        report = {**extra, "metrics": self.snapshot()}
+        _atomic_write(path, json.dumps(report, indent=2, default=str) + "\n")
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the metrics in the Prometheus text format, e.g. for node_exporter's textfile collector."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        typed = set()
+        for counter in snapshot["counters"]:
+            name = f"{PROMETHEUS_PREFIX}{counter['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels(counter['labels'])} {counter['value']:g}")
+        for histogram in snapshot["histograms"]:
+            name = f"{PROMETHEUS_PREFIX}{histogram['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0.0
+            bounds = [f"{bound:g}" for bound in snapshot["bounds"]] + ["+Inf"]
+            for bound, value in zip(bounds, histogram["buckets"]):
+                cumulative += value
+                lines.append(f"{name}_bucket{_labels({**histogram['labels'], 'le': bound})} {cumulative:g}")
+            lines.append(f"{name}_sum{_labels(histogram['labels'])} {histogram['sum']:g}")
+            lines.append(f"{name}_count{_labels(histogram['labels'])} {histogram['count']:g}")
+        _atomic_write(path, "\n".join(lines) + "\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _atomic_write(path: str, text: str) -> None:
+    # Scrapers of the textfile must never see a half-written file
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        handle.write(text)
+    # mkstemp creates 0600 files; collectors usually run as another user
+    os.chmod(tmp, 0o644)
+    os.replace(tmp, path)
+
+
+class RunProfiler:
+    """cProfile over the whole run, including the scraper's worker threads.
+
+    From Python 3.12 one profiler sees every thread; before that each thread started while
+    profiling gets its own profiler and the stats are merged when the dump is written.
+    """
+
+    def __init__(self):
+        self._main = cProfile.Profile()
+        self._threads: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._per_thread = sys.version_info < (3, 12)
+
+    def _start_thread(self, *_args) -> None:
+        profiler = cProfile.Profile()
+        with self._lock:
+            self._threads.append(profiler)
+        # Replaces this hook with cProfile's own for the rest of the thread
+        profiler.enable()
+
+    def start(self) -> None:
+        if self._per_thread:
+            threading.setprofile(self._start_thread)
+        self._main.enable()
+
+    def stop(self, path: str) -> None:
+        """Stop profiling and write merged stats to ``path`` (load with ``pstats``/snakeviz)."""
+        self._main.disable()
+        if self._per_thread:
+            threading.setprofile(None)
+        stats = pstats.Stats(self._main)
+        with self._lock:
+            for profiler in self._threads:
+                stats.add(profiler)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        stats.dump_stats(path)
+
+
+def profile_path(path: Optional[str], suffix: str) -> Optional[str]:
+    """``run.prof`` -> ``run.<suffix>.prof``, for per-worker dumps next to the main one."""
+    if not path:
+        return None
+    root, ext = os.path.splitext(path)
+    return f"{root}.{suffix}{ext or '.prof'}"
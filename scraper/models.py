@@ -0,0 +1,226 @@
+"""
+Slotted in-memory models for scraped cafés, their reviews and review sentiment.
+
+Candidates and reviews are created once by the provider normalisers and then shared by
+reference: merging two candidates moves review objects rather than copying them, sentiment is
+attached to the review it belongs to, and everything becomes a plain MongoDB document only
+when ``CafeScraper.build_documents`` hands it to the output sink. ``__slots__`` keeps each
+object free of a per-instance ``__dict__``, which adds up on multi-city runs.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+SENTIMENT_FACTORS = ("wifi", "outlets", "seating", "capacity", "drinks", "lighting", "noise")
+
+
+class Sentiment:
+    """Polarity of a whole review and of each workability factor it mentions."""
+
+    __slots__ = ("overall",) + SENTIMENT_FACTORS + ("keywords",)
+
+    def __init__(self, overall: float = 0.0, keywords: Optional[List[str]] = None, **factors: float):
+        self.overall = overall
+        for factor in SENTIMENT_FACTORS:
+            setattr(self, factor, factors.get(factor, 0.0))
+        self.keywords = keywords if keywords is not None else []
+
+    def to_dict(self) -> Dict:
+        """Document shape stored on reviews (and in the sentiment cache)."""
+        result: Dict = {"overall": self.overall}
+        for factor in SENTIMENT_FACTORS:
+            result[factor] = getattr(self, factor)
+        result["keywords"] = list(self.keywords)
+        return result
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Sentiment":
+        return cls(
+            overall=data.get("overall", 0.0),
+            keywords=list(data.get("keywords", [])),
+            **{factor: data.get(factor, 0.0) for factor in SENTIMENT_FACTORS},
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sentiment):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"Sentiment({self.to_dict()!r})"
+
+
+class Review:
+    __slots__ = (
+        "source",
+        "source_id",
+        "author",
+        "rating",
+        "text",
+        "date",
+        "url",
+        "sentiment",
+        "duplicate_of",
+        "is_duplicate",
+    )
+
+    def __init__(
+        self,
+        source: str,
+        text: str,
+        source_id: Optional[str] = None,
+        author: Optional[str] = None,
+        rating: Optional[float] = None,
+        date: Optional[datetime] = None,
+        url: Optional[str] = None,
+        sentiment: Optional[Sentiment] = None,
+        duplicate_of: Optional[str] = None,
+        is_duplicate: bool = False,
+    ):
+        self.source = source
+        self.text = text
+        self.source_id = source_id
+        self.author = author
+        self.rating = rating
+        self.date = date
+        self.url = url
+        self.sentiment = sentiment
+        # source_id of the earlier review of the same café that this one nearly duplicates
+        self.duplicate_of = duplicate_of
+        # Whether this is a later copy in its near-duplicate cluster; unlike duplicate_of it is
+        # set even when the first copy has no source_id
+        self.is_duplicate = is_duplicate
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Review":
+        sentiment = data.get("sentiment")
+        return cls(
+            source=data.get("source", "unknown"),
+            text=data.get("text", ""),
+            source_id=data.get("source_id"),
+            author=data.get("author"),
+            rating=data.get("rating"),
+            date=data.get("date"),
+            url=data.get("url"),
+            sentiment=Sentiment.from_dict(sentiment) if isinstance(sentiment, dict) else sentiment,
+            duplicate_of=data.get("duplicate_of"),
+        )
+
+
+class Candidate:
+    """One café as reported by one or more providers."""
+
+    __slots__ = (
+        "name",
+        "address",
+        "city",
+        "neighborhood",
+        "lat",
+        "lng",
+        "phone",
+        "website",
+        "hours",
+        "types",
+        "price_level",
+        "rating",
+        "rating_sources",
+        "review_counts",
+        "google_maps_id",
+        "yelp_id",
+        "sources",
+        "reviews",
+    )
+
+    def __init__(
+        self,
+        name: str = "",
+        address: str = "",
+        city: Optional[str] = None,
+        neighborhood: Optional[str] = None,
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+        phone: Optional[str] = None,
+        website: Optional[str] = None,
+        hours: Optional[Dict] = None,
+        types: Optional[Set[str]] = None,
+        price_level: Optional[int] = None,
+        rating: Optional[float] = None,
+        rating_sources: Optional[Dict[str, Optional[float]]] = None,
+        review_counts: Optional[Dict[str, Optional[int]]] = None,
+        google_maps_id: Optional[str] = None,
+        yelp_id: Optional[str] = None,
+        sources: Optional[Set[str]] = None,
+        reviews: Optional[List[Review]] = None,
+    ):
+        self.name = name or ""
+        self.address = address or ""
+        self.city = city
+        self.neighborhood = neighborhood
+        self.lat = lat
+        self.lng = lng
+        self.phone = phone
+        self.website = website
+        self.hours = hours if hours is not None else {}
+        self.types = types if types is not None else set()
+        self.price_level = price_level
+        self.rating = rating
+        self.rating_sources = rating_sources if rating_sources is not None else {}
+        self.review_counts = review_counts if review_counts is not None else {}
+        self.google_maps_id = google_maps_id
+        self.yelp_id = yelp_id
+        self.sources = sources if sources is not None else set()
+        self.reviews = reviews if reviews is not None else []
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Candidate":
+        """Build a candidate from the dict shape custom providers may still return."""
+        fields = {name: data[name] for name in cls.__slots__ if name in data}
+        fields["types"] = set(data.get("types", ()))
+        fields["sources"] = set(data.get("sources", ()))
+        fields["rating_sources"] = dict(data.get("rating_sources", {}))
+        fields["review_counts"] = dict(data.get("review_counts", {}))
+        fields["reviews"] = [
+            review if isinstance(review, Review) else Review.from_dict(review)
+            for review in data.get("reviews", [])
+        ]
+        return cls(**fields)
+
+    def copy(self) -> "Candidate":
+        """Copy with fresh containers, sharing the (immutable in practice) review objects."""
+        clone = Candidate.__new__(Candidate)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone.types = set(self.types)
+        clone.sources = set(self.sources)
+        clone.rating_sources = dict(self.rating_sources)
+        clone.review_counts = dict(self.review_counts)
+        clone.reviews = list(self.reviews)
+        return clone
+
+    def merge(self, other: "Candidate") -> None:
+        """Fold ``other`` into this candidate in place; its review objects are moved, not copied."""
+        self.sources.update(other.sources)
+        self.types.update(other.types)
+        self.reviews.extend(other.reviews)
+
+        for field in (
+            "phone",
+            "website",
+            "hours",
+            "google_maps_id",
+            "yelp_id",
+            "lat",
+            "lng",
+            "neighborhood",
+            "city",
+        ):
+            if not getattr(self, field) and getattr(other, field):
+                setattr(self, field, getattr(other, field))
+
+        if self.price_level is None and other.price_level is not None:
+            self.price_level = other.price_level
+
+        self.rating_sources.update({k: v for k, v in other.rating_sources.items() if v is not None})
+        self.review_counts.update({k: v for k, v in other.review_counts.items() if v is not None})
@@ -0,0 +1,202 @@
+"""
+Bulk MongoDB persistence for scraped cafés and their reviews.
+
+A whole city is written in a fixed number of round trips regardless of size: one lookup of
+existing cafés, then unordered ``bulk_write`` batches for café upserts, stale-review deletes
+and review upserts, followed by one pass that syncs each café's ``reviews`` id array.
+``OutputSink`` is the interface shared with the file sinks in ``sinks.py``.
+"""
+
+from __future__ import annotations
+
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import DeleteMany, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# (café document, review documents without the "cafe" reference)
+CafeEntry = Tuple[Dict, List[Dict]]
+
+
+class OutputSink:
+    """Destination for scraped entries; ``write`` returns a MongoBulkWriter-style report."""
+
+    # Whether scrape_city may sync against or replace stored cafés (only a database can)
+    supports_sync = False
+
+    def begin_city(self, city: str) -> None:
+        """Called before the first ``write`` for ``city``."""
+
+    def write(self, entries: List[CafeEntry]) -> Dict:
+        raise NotImplementedError
+
+    def end_city(self) -> None:
+        """Called after the last ``write`` for the current city, even when scraping failed."""
+
+    def close(self) -> None:
+        pass
+
+
+class MongoBulkWriter(OutputSink):
+    """Upserts cafés by provider id and reviews by ``(cafe, sourceId)``."""
+
+    supports_sync = True
+
+    def __init__(self, db, metrics=None):
+        self.db = db
+        # Optional metrics.RunMetrics; every database round trip is timed when set
+        self.metrics = metrics
+
+    def _round_trip(self, collection: str, op: str):
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.timer("db_round_trip_seconds", collection=collection, op=op)
+
+    def write(self, entries: List[CafeEntry]) -> Dict:
+        """Persist ``entries`` and return ``{"cafes": [...], "batches": [...]}``.
+
+        ``cafes`` lists ``(name, cafe_id, action)`` per entry, where action is "Added" or
+        "Updated"; ``batches`` holds per-batch counts and any write errors.
+        """
+        report: Dict = {"cafes": [], "batches": []}
+        if not entries:
+            return report
+
+        existing = self._resolve_existing([cafe_doc for cafe_doc, _ in entries])
+        cafe_ops: List[UpdateOne] = []
+        cafe_ids: List[ObjectId] = []
+        for index, (cafe_doc, _) in enumerate(entries):
+            found = existing[index]
+            if found is not None:
+                cafe_ids.append(found)
+                cafe_ops.append(UpdateOne({"_id": found}, {"$set": cafe_doc}))
+                continue
+            new_id = ObjectId()
+            cafe_ids.append(new_id)
+            cafe_ops.append(
+                UpdateOne(
+                    self._provider_filter(cafe_doc) or {"_id": new_id},
+                    {"$set": cafe_doc, "$setOnInsert": {"_id": new_id}},
+                    upsert=True,
+                )
+            )
+        upserted = self._run(self.db.cafes, "cafes", cafe_ops, report)
+
+        # A concurrent writer may have inserted the same place since the lookup; adopt its id
+        for index, (cafe_doc, _) in enumerate(entries):
+            if existing[index] is None and index not in upserted:
+                provider_filter = self._provider_filter(cafe_doc)
+                match = None
+                if provider_filter:
+                    with self._round_trip("cafes", "find_one"):
+                        match = self.db.cafes.find_one(provider_filter, {"_id": 1})
+                if match:
+                    cafe_ids[index] = match["_id"]
+
+        delete_ops = []
+        review_ops = []
+        for cafe_id, (_, review_docs) in zip(cafe_ids, entries):
+            source_ids = [doc["sourceId"] for doc in review_docs if doc.get("sourceId")]
+            delete_ops.append(DeleteMany({"cafe": cafe_id, "sourceId": {"$nin": source_ids}}))
+            for review_doc in review_docs:
+                doc = {**review_doc, "cafe": cafe_id}
+                review_filter = (
+                    {"cafe": cafe_id, "sourceId": doc["sourceId"]}
+                    if doc.get("sourceId")
+                    else {"_id": ObjectId()}
+                )
+                review_ops.append(UpdateOne(review_filter, {"$set": doc}, upsert=True))
+        # Deletes must land before the upserts, which an unordered batch would not guarantee
+        self._run(self.db.reviews, "stale reviews", delete_ops, report)
+        self._run(self.db.reviews, "reviews", review_ops, report)
+
+        review_ids: Dict[ObjectId, List[ObjectId]] = {cafe_id: [] for cafe_id in cafe_ids}
+        with self._round_trip("reviews", "find"):
+            stored_reviews = list(self.db.reviews.find({"cafe": {"$in": cafe_ids}}, {"_id": 1, "cafe": 1}))
+        for doc in stored_reviews:
+            review_ids.setdefault(doc["cafe"], []).append(doc["_id"])
+        link_ops = [
+            UpdateOne({"_id": cafe_id}, {"$set": {"reviews": ids}})
+            for cafe_id, ids in review_ids.items()
+        ]
+        self._run(self.db.cafes, "review links", link_ops, report)
+
+        for index, (cafe_doc, _) in enumerate(entries):
+            action = "Updated" if existing[index] is not None else "Added"
+            report["cafes"].append((cafe_doc.get("name", ""), cafe_ids[index], action))
+        return report
+
+    def _provider_filter(self, cafe_doc: Dict) -> Optional[Dict]:
+        if cafe_doc.get("googleMapsId"):
+            return {"googleMapsId": cafe_doc["googleMapsId"]}
+        if cafe_doc.get("yelpId"):
+            return {"yelpId": cafe_doc["yelpId"]}
+        return None
+
+    def _resolve_existing(self, cafe_docs: List[Dict]) -> List[Optional[ObjectId]]:
+        """Find stored cafés in one query, matching by Google id, then Yelp id, then name+address."""
+        google_ids = [doc["googleMapsId"] for doc in cafe_docs if doc.get("googleMapsId")]
+        yelp_ids = [doc["yelpId"] for doc in cafe_docs if doc.get("yelpId")]
+        clauses: List[Dict] = [
+            {"name": doc.get("name", ""), "address": doc.get("address", "")} for doc in cafe_docs
+        ]
+        if google_ids:
+            clauses.append({"googleMapsId": {"$in": google_ids}})
+        if yelp_ids:
+            clauses.append({"yelpId": {"$in": yelp_ids}})
+
+        by_google: Dict[str, ObjectId] = {}
+        by_yelp: Dict[str, ObjectId] = {}
+        by_name: Dict[Tuple[str, str], ObjectId] = {}
+        projection = {"_id": 1, "googleMapsId": 1, "yelpId": 1, "name": 1, "address": 1}
+        with self._round_trip("cafes", "find"):
+            stored_cafes = list(self.db.cafes.find({"$or": clauses}, projection))
+        for stored in stored_cafes:
+            if stored.get("googleMapsId"):
+                by_google.setdefault(stored["googleMapsId"], stored["_id"])
+            if stored.get("yelpId"):
+                by_yelp.setdefault(stored["yelpId"], stored["_id"])
+            by_name.setdefault((stored.get("name", ""), stored.get("address", "")), stored["_id"])
+
+        resolved: List[Optional[ObjectId]] = []
+        for doc in cafe_docs:
+            resolved.append(
+                by_google.get(doc.get("googleMapsId"))
+                or by_yelp.get(doc.get("yelpId"))
+                or by_name.get((doc.get("name", ""), doc.get("address", "")))
+            )
+        return resolved
+
+    def _run(self, collection, name: str, ops: List, report: Dict) -> Dict[int, ObjectId]:
+        """Execute one unordered batch, record its counts, and return upserted ids by op index."""
+        if not ops:
+            return {}
+        batch = {"batch": name, "ops": len(ops), "errors": []}
+        try:
+            with self._round_trip(collection.name, "bulk_write"):
+                result = collection.bulk_write(ops, ordered=False)
+        except BulkWriteError as exc:
+            details = exc.details
+            batch["errors"] = [
+                error.get("errmsg", str(error)) for error in details.get("writeErrors", [])
+            ]
+            batch.update(
+                inserted=details.get("nInserted", 0),
+                upserted=details.get("nUpserted", 0),
+                matched=details.get("nMatched", 0),
+                modified=details.get("nModified", 0),
+                deleted=details.get("nRemoved", 0),
+            )
+            report["batches"].append(batch)
+            return {upsert["index"]: upsert["_id"] for upsert in details.get("upserted", [])}
+        batch.update(
+            inserted=result.inserted_count,
+            upserted=result.upserted_count,
+            matched=result.matched_count,
+            modified=result.modified_count,
+            deleted=result.deleted_count,
+        )
+        report["batches"].append(batch)
+        return result.upserted_ids or {}
@@ -0,0 +1,72 @@
+"""
+Small building blocks for running scrape stages concurrently.
+
+Each stage runs on its own thread and hands results downstream through a bounded queue, so a
+slow consumer stalls its producer (backpressure) instead of letting work pile up in memory.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Callable, Deque, Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+_DONE = object()
+
+
+def bounded_stage(
+    upstream: Iterable[T], fn: Callable[[T], U], maxsize: int = 2, name: str = "stage"
+) -> Iterator[U]:
+    """Apply ``fn`` to each upstream item on a background thread and yield results in order.
+
+    At most ``maxsize`` finished results wait in the queue. Exceptions raised upstream or in
+    ``fn`` are re-raised in the consumer, and abandoning the iterator stops the worker.
+    """
+    results: "queue.Queue" = queue.Queue(maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def work() -> None:
+        try:
+            for item in upstream:
+                if stop.is_set() or not put((True, fn(item))):
+                    return
+        except BaseException as exc:  # surfaced to the consumer below
+            put((False, exc))
+            return
+        put((True, _DONE))
+
+    worker = threading.Thread(target=work, name=name, daemon=True)
+    worker.start()
+    try:
+        while True:
+            ok, value = results.get()
+            if not ok:
+                raise value
+            if value is _DONE:
+                return
+            yield value
+    finally:
+        stop.set()
+        worker.join()
+
+
+def drain_chunks(pending: Deque[T], size: int) -> Iterator[List[T]]:
+    """Yield ``size``-item chunks, popping items off ``pending`` as they go out.
+
+    Once a chunk has been processed downstream nothing else references its items, so memory
+    held by finished work is released while later chunks are still running.
+    """
+    while pending:
+        yield [pending.popleft() for _ in range(min(size, len(pending)))]
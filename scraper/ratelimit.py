@@ -0,0 +1,132 @@
+"""
+Request pacing shared by every thread and worker process of a scrape run, and the hourly
+API budget of the refresh daemon.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional
+
+# Fraction of the configured rate regained after each successful request
+_RECOVERY_STEP = 0.05
+# Multiplier applied to the current rate whenever the provider throttles us
+_BACKOFF_FACTOR = 0.5
+
+# Slots of the shared state array
+_TOKENS, _UPDATED_AT, _RATE, _PAUSED_UNTIL = range(4)
+
+
+class RateLimiter:
+    """Adaptive token bucket allowing at most ``rate`` requests per second.
+
+    Up to ``burst`` requests may go out back to back after an idle spell. When the provider
+    throttles (HTTP 429, ``OVER_QUERY_LIMIT``) the rate is halved and every caller pauses for
+    the server's Retry-After; successful requests then raise it again in small steps up to the
+    configured ceiling. The bucket lives in shared memory, so one limiter handed to a process
+    pool's initializer throttles all workers together instead of each process getting its own
+    quota. A ``rate`` of 0 disables pacing but still honours throttling pauses.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, min_rate: Optional[float] = None):
+        self.max_rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        if min_rate is None:
+            min_rate = max(rate / 16, 0.1) if rate > 0 else 0.0
+        self.min_rate = min_rate
+        self._state = multiprocessing.Array("d", [self.burst, time.time(), rate, 0.0])
+
+    @property
+    def rate(self) -> float:
+        """Current (possibly reduced) requests-per-second allowance."""
+        return self._state[_RATE]
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._state.get_lock():
+                state = self._state
+                now = time.time()
+                rate = state[_RATE]
+                if now < state[_PAUSED_UNTIL]:
+                    delay = state[_PAUSED_UNTIL] - now
+                elif rate <= 0:
+                    return
+                else:
+                    elapsed = max(0.0, now - state[_UPDATED_AT])
+                    state[_TOKENS] = min(self.burst, state[_TOKENS] + elapsed * rate)
+                    state[_UPDATED_AT] = now
+                    if state[_TOKENS] >= 1.0:
+                        state[_TOKENS] -= 1.0
+                        return
+                    delay = (1.0 - state[_TOKENS]) / rate
+            time.sleep(delay)
+
+    def throttled(self, retry_after: Optional[float] = None) -> float:
+        """Record a throttling response and return the pause every caller now observes."""
+        with self._state.get_lock():
+            state = self._state
+            now = time.time()
+            if state[_RATE] > 0:
+                state[_RATE] = max(self.min_rate, state[_RATE] * _BACKOFF_FACTOR)
+                state[_TOKENS] = 0.0
+                state[_UPDATED_AT] = now
+            pause = retry_after if retry_after is not None else (
+                1.0 / state[_RATE] if state[_RATE] > 0 else 1.0
+            )
+            state[_PAUSED_UNTIL] = max(state[_PAUSED_UNTIL], now + pause)
+            return state[_PAUSED_UNTIL] - now
+
+    def succeeded(self) -> None:
+        """Record a successful request, recovering some of the rate lost to throttling."""
+        if self.max_rate <= 0:
+            return
+        with self._state.get_lock():
+            if self._state[_RATE] < self.max_rate:
+                self._state[_RATE] = min(
+                    self.max_rate, self._state[_RATE] + self.max_rate * _RECOVERY_STEP
+                )
+
+
+class HourlyBudget:
+    """Sliding one-hour window allowing at most ``calls_per_hour`` provider requests.
+
+    Where ``RateLimiter`` smooths bursts within a second, this caps what a long-running refresh
+    spends over time. ``acquire`` blocks until the oldest request of the window has aged out.
+    A budget of 0 disables the cap. It is shared by the threads of one process.
+    """
+
+    def __init__(self, calls_per_hour: int, window: float = 3600.0):
+        self.calls_per_hour = max(0, int(calls_per_hour))
+        self.window = window
+        self._sent: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def remaining(self) -> int:
+        """Requests still allowed in the current window (0 when the cap is disabled)."""
+        if self.calls_per_hour <= 0:
+            return 0
+        with self._lock:
+            self._expire(time.monotonic())
+            return self.calls_per_hour - len(self._sent)
+
+    def acquire(self) -> None:
+        """Block until a request fits in the budget, then count it."""
+        if self.calls_per_hour <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                if len(self._sent) < self.calls_per_hour:
+                    self._sent.append(now)
+                    return
+                delay = self._sent[0] + self.window - now
+            time.sleep(delay)
+
+    def _expire(self, now: float) -> None:
+        while self._sent and self._sent[0] <= now - self.window:
+            self._sent.popleft()
@@ -0,0 +1,191 @@
+"""
+Staleness-prioritised refresh of stored cafés.
+
+Instead of periodic full-city scrapes, ``RefreshScheduler`` keeps a priority queue of the
+stored cafés and re-fetches the most valuable ones one café at a time. A café's priority
+grows with the time since ``lastUpdated`` and with its review velocity (new reviews per day),
+since a busy café gathers missed reviews faster. It also grows with the uncertainty of its
+score. A café with few ``reviewsAnalyzed`` is still mostly the smoothing prior, so each new
+review moves it more. Provider requests go through the scraper's ``HourlyBudget``, so the
+daemon spends a fixed number of API calls per hour however large the collection is.
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from scoring import SMOOTHING_K
+
+DEFAULT_REFRESH_WORKERS = 4
+DEFAULT_API_BUDGET = 1000
+# Cafés refreshed more recently than this are left alone even when budget is spare
+DEFAULT_MIN_AGE_HOURS = 24.0
+# How often the queue is rebuilt from MongoDB, picking up new cafés and fresh priorities
+DEFAULT_RESCAN_SECONDS = 900.0
+# Reviews per day assumed for every café, so quiet cafés still come round eventually
+BASELINE_VELOCITY = 0.1
+# Weight of the latest observation in the smoothed review velocity
+VELOCITY_SMOOTHING = 0.5
+# Age assumed for cafés that were never stamped with lastUpdated
+_UNKNOWN_AGE_DAYS = 365.0
+
+# Fields the scheduler and ``CafeScraper.refresh_cafe`` need from each stored café
+REFRESH_PROJECTION = {
+    "name": 1,
+    "city": 1,
+    "googleMapsId": 1,
+    "yelpId": 1,
+    "reviewCounts": 1,
+    "reviewVelocity": 1,
+    "contentFingerprint": 1,
+    "lastUpdated": 1,
+    "metrics.confidence.reviewsAnalyzed": 1,
+}
+
+
+def age_days(doc: Dict, now: datetime) -> float:
+    last_updated = doc.get("lastUpdated")
+    if not isinstance(last_updated, datetime):
+        return _UNKNOWN_AGE_DAYS
+    if last_updated.tzinfo is None:
+        # PyMongo returns naive UTC datetimes unless the client is tz-aware
+        last_updated = last_updated.replace(tzinfo=timezone.utc)
+    return max(0.0, (now - last_updated).total_seconds() / 86400)
+
+
+def refresh_priority(doc: Dict, now: datetime) -> float:
+    """Expected value of refreshing a stored café now; higher goes first.
+
+    ``age × (baseline + velocity)`` estimates how many reviews the stored copy is missing.
+    It is scaled up by the weight the smoothing prior still carries in the café's score.
+    """
+    analysed = ((doc.get("metrics") or {}).get("confidence") or {}).get("reviewsAnalyzed") or 0
+    uncertainty = SMOOTHING_K / (SMOOTHING_K + analysed)
+    velocity = doc.get("reviewVelocity") or 0.0
+    return age_days(doc, now) * (BASELINE_VELOCITY + velocity) * (1 + uncertainty)
+
+
+def review_velocity(doc: Dict, review_counts: Dict[str, Optional[int]], now: datetime) -> float:
+    """Smoothed new reviews per day, from the stored and freshly fetched provider counts."""
+    previous = _total(doc.get("reviewCounts") or {})
+    current = _total(review_counts)
+    # At least an hour, so a quick re-check can't report an absurd rate
+    elapsed = max(age_days(doc, now), 1 / 24)
+    observed = max(0, current - previous) / elapsed
+    prior = doc.get("reviewVelocity")
+    if prior is None:
+        return round(observed, 4)
+    return round(VELOCITY_SMOOTHING * observed + (1 - VELOCITY_SMOOTHING) * prior, 4)
+
+
+def _total(review_counts: Dict[str, Optional[int]]) -> float:
+    return sum(count for count in review_counts.values() if isinstance(count, (int, float)))
+
+
+class RefreshScheduler:
+    """Refreshes stored cafés in priority order with a pool of worker threads.
+
+    ``scraper`` is a ``CafeScraper`` connected to MongoDB. Each refresh calls its
+    ``refresh_cafe``, and the API budget is enforced inside its provider requests.
+    """
+
+    def __init__(
+        self,
+        scraper,
+        workers: int = DEFAULT_REFRESH_WORKERS,
+        city_filter: Optional[Dict] = None,
+        min_age_hours: float = DEFAULT_MIN_AGE_HOURS,
+        rescan_seconds: float = DEFAULT_RESCAN_SECONDS,
+    ):
+        self.scraper = scraper
+        self.workers = max(1, workers)
+        self.city_filter = city_filter or {}
+        self.min_age_days = min_age_hours / 24
+        self.rescan_seconds = rescan_seconds
+        # (-priority, tiebreak, café); heapq is a min-heap
+        self._queue: List[Tuple[float, int, Dict]] = []
+        self._loaded_at: Optional[float] = None
+        # Cafés whose providers no longer return them; skipped until the daemon restarts
+        self._missing = set()
+        # Cafés whose refresh failed, by the time they may be retried
+        self._retry_at: Dict[object, float] = {}
+
+    def load(self, exclude: Optional[set] = None) -> int:
+        """Rebuild the queue from MongoDB and return how many cafés are due."""
+        now = datetime.now(timezone.utc)
+        query = {**self.city_filter, "retired": {"$ne": True}}
+        with self.scraper.metrics.timer("db_round_trip_seconds", collection="cafes", op="find"):
+            stored = list(self.scraper.db.cafes.find(query, REFRESH_PROJECTION))
+        self._retry_at = {cafe_id: at for cafe_id, at in self._retry_at.items() if at > time.monotonic()}
+        skip = self._missing | set(self._retry_at) | (exclude or set())
+        self._queue = [
+            (-refresh_priority(doc, now), index, doc)
+            for index, doc in enumerate(stored)
+            if doc["_id"] not in skip and age_days(doc, now) >= self.min_age_days
+        ]
+        heapq.heapify(self._queue)
+        self._loaded_at = time.monotonic()
+        return len(self._queue)
+
+    def run(self, max_refreshes: Optional[int] = None) -> Dict[str, int]:
+        """Refresh cafés until interrupted and return counts by result.
+
+        With ``max_refreshes`` it also stops after that many refreshes, or once nothing is due.
+        """
+        results: Counter = Counter()
+        in_flight: Dict[Future, object] = {}
+        submitted = 0
+
+        def collect(done) -> None:
+            for future in done:
+                cafe_id = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    print(f"❌ Refresh failed for café {cafe_id}: {exc}")
+                    result = "error"
+                if result == "missing":
+                    self._missing.add(cafe_id)
+                elif result in ("failed", "error"):
+                    self._retry_at[cafe_id] = time.monotonic() + self.rescan_seconds
+                results[result] += 1
+                self.scraper.metrics.count("refreshes_total", result=result)
+
+        print(f"🔄 Refresh daemon started ({self.workers} workers)")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                while max_refreshes is None or submitted < max_refreshes:
+                    if len(in_flight) >= self.workers:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                        continue
+                    if not self._queue and in_flight:
+                        # Reload once the current batch has landed, so it isn't picked twice
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
+                        continue
+                    if not self._queue or time.monotonic() - self._loaded_at > self.rescan_seconds:
+                        due = self.load(exclude=set(in_flight.values()))
+                        if due:
+                            print(f"🗂️  {due} cafés due for a refresh")
+                    if not self._queue:
+                        if max_refreshes is not None:
+                            break
+                        # Nothing is due until the next rescan
+                        time.sleep(self.rescan_seconds)
+                        continue
+                    _, _, doc = heapq.heappop(self._queue)
+                    in_flight[executor.submit(self.scraper.refresh_cafe, doc)] = doc["_id"]
+                    submitted += 1
+            except KeyboardInterrupt:
+                print("🛑 Stopping; waiting for in-flight refreshes")
+            done, _ = wait(in_flight)
+            collect(done)
+        outcome = ", ".join(f"{count} {result}" for result, count in sorted(results.items()))
+        print(f"🔄 Refresh daemon stopped: {outcome or 'nothing refreshed'}")
+        return dict(results)
@@ -0,0 +1,127 @@
+"""
+Near-duplicate review detection within one café.
+
+The same author often posts one review to both Google and Yelp with small edits. Counting
+both copies would analyse the text twice and count its factor mentions twice, which inflates
+a café's confidence. Each review is reduced to a MinHash signature over character shingles.
+Signatures are split into bands, and reviews that share a band bucket (LSH) are compared
+signature to signature. Reviews whose estimated Jaccard similarity reaches ``threshold`` are
+clustered together. Only plausible cross-posts may join a cluster: two copies must come from
+different sources or share a normalised author, and very short reviews ("Good coffee!") are
+never clustered, since different people write them independently. A café only compares its
+own reviews, so the work stays small and independent of city size.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.75
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 128
+# 32 bands of 4 rows: pairs above about 0.6 similarity almost always share a bucket
+NUM_BANDS = 32
+# Normalised characters a review needs before it may join a cluster
+MIN_CLUSTER_LENGTH = 40
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WHITESPACE = re.compile(r"\s+")
+_rng = np.random.default_rng(20240601)
+# Seeded so signatures are comparable across processes and runs
+_A = _rng.integers(1, (1 << 61) - 1, size=(NUM_PERMUTATIONS, 1), dtype=np.uint64)
+_B = _rng.integers(0, (1 << 61) - 1, size=(NUM_PERMUTATIONS, 1), dtype=np.uint64)
+
+
+def _normalise(text: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", (text or "").lower()).strip()
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """32-bit hashes of the overlapping character ``size``-grams of the normalised text."""
+    normalised = _normalise(text)
+    if len(normalised) <= size:
+        grams = {normalised}
+    else:
+        grams = {normalised[i : i + size] for i in range(len(normalised) - size + 1)}
+    return np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint64)
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature: the minimum of each universal hash over the text's shingles."""
+    # uint64 products wrap on overflow, which only mixes the hashes further
+    hashed = ((_A * shingles(text)[np.newaxis, :] + _B) % _MERSENNE_PRIME) & _MAX_HASH
+    return hashed.min(axis=1)
+
+
+def review_clusters(
+    texts: Sequence[str],
+    threshold: float = DEFAULT_THRESHOLD,
+    sources: Optional[Sequence[Optional[str]]] = None,
+    authors: Optional[Sequence[Optional[str]]] = None,
+    min_length: int = MIN_CLUSTER_LENGTH,
+) -> List[List[int]]:
+    """Group the indices of near-duplicate texts.
+
+    With ``sources`` and ``authors`` (parallel to ``texts``), a cluster never holds two
+    reviews from the same source by different or unknown authors. Texts shorter than
+    ``min_length`` after normalisation stay on their own. Clusters come back in order of
+    first appearance and each cluster lists its indices in order, so ``cluster[0]`` is the
+    earliest copy. Texts without a near duplicate form single-item clusters.
+    """
+    eligible = [index for index, text in enumerate(texts) if len(_normalise(text)) >= min_length]
+    if len(eligible) < 2:
+        return [[index] for index in range(len(texts))]
+
+    signatures = np.stack([signature(texts[index]) for index in eligible])
+    rows = NUM_PERMUTATIONS // NUM_BANDS
+    parent = list(range(len(texts)))
+    members: Dict[int, List[int]] = {index: [index] for index in range(len(texts))}
+    names = [_normalise(author) for author in authors] if authors is not None else None
+
+    def root(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def compatible(left: int, right: int) -> bool:
+        # The same author cross-posting, or copies on different sites
+        if sources is None or sources[left] != sources[right]:
+            return True
+        return names is not None and bool(names[left]) and names[left] == names[right]
+
+    def union(left: int, right: int) -> None:
+        left_root, right_root = root(left), root(right)
+        if left_root == right_root:
+            return
+        # Every pair in the merged cluster must be compatible, not just the two that matched
+        if not all(compatible(a, b) for a in members[left_root] for b in members[right_root]):
+            return
+        keep, drop = min(left_root, right_root), max(left_root, right_root)
+        parent[drop] = keep
+        members[keep].extend(members.pop(drop))
+
+    checked = set()
+    for band in range(NUM_BANDS):
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        for position, band_values in enumerate(signatures[:, band * rows : (band + 1) * rows]):
+            buckets.setdefault(tuple(band_values.tolist()), []).append(position)
+        for bucket in buckets.values():
+            for offset, left in enumerate(bucket):
+                for right in bucket[offset + 1 :]:
+                    if (left, right) in checked:
+                        continue
+                    checked.add((left, right))
+                    # Share of agreeing signature slots estimates the Jaccard similarity
+                    if np.mean(signatures[left] == signatures[right]) >= threshold:
+                        union(eligible[left], eligible[right])
+
+    clusters: Dict[int, List[int]] = {}
+    for index in range(len(texts)):
+        clusters.setdefault(root(index), []).append(index)
+    return list(clusters.values())
@@ -0,0 +1,193 @@
+"""
+Holistic Workability Index (HWI) scoring for many cafés at once.
+
+Per-review factor sentiment is packed into a reviews × factors matrix with a mention mask,
+then amenity averages, functional/atmospheric components, smoothed workability scores and
+tags are computed for a whole city with NumPy. The formulas mirror the backend's Cafe model.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models import Sentiment
+
+GLOBAL_HWI_MEAN = 6.8
+SMOOTHING_K = 8
+
+FACTORS: Tuple[str, ...] = ("wifi", "outlets", "seating", "capacity", "drinks", "lighting", "noise")
+_COL = {factor: index for index, factor in enumerate(FACTORS)}
+
+# (factor, amenity label field, [(threshold, label), ...], fallback label); label applies when avg > threshold
+_QUALITY_BANDS = (
+    ("wifi", "quality", [(0.35, "excellent"), (0.05, "good"), (-0.25, "spotty")], "poor"),
+    ("seating", "type", [(0.35, "comfortable"), (0.05, "adequate")], "limited"),
+    ("capacity", "level", [(0.35, "ample"), (0.1, "roomy"), (-0.25, "cozy")], "tight"),
+    ("drinks", "quality", [(0.4, "excellent"), (0.1, "good"), (-0.25, "average")], "poor"),
+    ("lighting", "quality", [(0.35, "bright"), (-0.2, "balanced")], "dim"),
+    ("noise", "level", [(0.35, "quiet"), (-0.25, "moderate")], "loud"),
+)
+
+
+def _safe_value(value: Optional[float]) -> float:
+    if value is None or not isinstance(value, (int, float)) or math.isnan(value):
+        return 0.0
+    return float(value)
+
+
+def build_factor_matrix(
+    sentiment_lists: Sequence[Sequence[Sentiment]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pack per-café review sentiments into ``(values, mask, cafe_index)`` arrays.
+
+    ``values`` and ``mask`` are reviews × factors; ``cafe_index`` maps each review row to the
+    position of its café in ``sentiment_lists``.
+    """
+    total = sum(len(sentiments) for sentiments in sentiment_lists)
+    values = np.zeros((total, len(FACTORS)))
+    mask = np.zeros((total, len(FACTORS)), dtype=bool)
+    cafe_index = np.empty(total, dtype=np.intp)
+    row = 0
+    for cafe, sentiments in enumerate(sentiment_lists):
+        for sentiment in sentiments:
+            cafe_index[row] = cafe
+            for keyword in set(sentiment.keywords):
+                col = _COL.get(keyword)
+                if col is not None:
+                    mask[row, col] = True
+                    values[row, col] = _safe_value(getattr(sentiment, keyword))
+            row += 1
+    return values, mask, cafe_index
+
+
+def _clamp(values: np.ndarray, default: float = 5.0) -> np.ndarray:
+    return np.clip(np.where(np.isnan(values), default, values), 0.0, 10.0)
+
+
+def score_cafes(
+    sentiment_lists: Sequence[Sequence[Sentiment]], ratings: Sequence[Optional[float]]
+) -> List[Dict]:
+    """Score every café from its reviews' sentiments and its star rating (0-5).
+
+    Returns one dict per café with ``amenities``, ``factor_counts``, ``metrics``, ``tags`` and
+    ``workability_score``, in the same shapes process_cafe stores.
+    """
+    cafes = len(sentiment_lists)
+    values, mask, cafe_index = build_factor_matrix(sentiment_lists)
+
+    # np.add.at accumulates rows in order, matching a sequential per-café sum
+    sums = np.zeros((cafes, len(FACTORS)))
+    np.add.at(sums, cafe_index, np.where(mask, values, 0.0))
+    counts = np.zeros((cafes, len(FACTORS)), dtype=np.int64)
+    np.add.at(counts, cafe_index, mask)
+    review_counts = np.bincount(cafe_index, minlength=cafes)
+
+    outlet_col = _COL["outlets"]
+    positive_outlets = np.zeros(cafes, dtype=np.int64)
+    np.add.at(positive_outlets, cafe_index, mask[:, outlet_col] & (values[:, outlet_col] > 0))
+
+    averages = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+    has_reviews = review_counts > 0
+    scores = np.where(has_reviews[:, None], np.clip((averages + 1) * 5, 0.0, 10.0), 5.0)
+
+    labels: Dict[str, np.ndarray] = {}
+    for factor, _, bands, fallback in _QUALITY_BANDS:
+        avg = averages[:, _COL[factor]]
+        labels[factor] = np.where(
+            has_reviews,
+            np.select([avg > threshold for threshold, _ in bands], [label for _, label in bands], fallback),
+            "unknown",
+        )
+    outlets_available = has_reviews & (positive_outlets >= 2)
+
+    wifi = 10.0 / (1.0 + np.exp(-0.5 * (_clamp(scores[:, _COL["wifi"]]) - 5.0)))
+    seating = _clamp(scores[:, _COL["seating"]])
+    outlets = _clamp(scores[:, _COL["outlets"]])
+    capacity = _clamp(scores[:, _COL["capacity"]])
+    drinks = _clamp(scores[:, _COL["drinks"]])
+    lighting = _clamp(scores[:, _COL["lighting"]])
+    noise = 10.0 * np.exp(-((_clamp(scores[:, _COL["noise"]]) - 5.0) ** 2) / 10.0)
+
+    functional = wifi * 0.35 + seating * 0.25 + outlets * 0.20 + capacity * 0.10 + drinks * 0.10
+    rating_array = np.array([np.nan if r is None else float(r) for r in ratings], dtype=float)
+    reputation = _clamp(rating_array * 2.0, default=GLOBAL_HWI_MEAN)
+    atmospheric = reputation * 0.5 + noise * 0.25 + lighting * 0.25
+
+    raw = functional * 0.7 + atmospheric * 0.3
+    denominator = review_counts + SMOOTHING_K
+    adjusted = (review_counts / denominator) * raw + (SMOOTHING_K / denominator) * GLOBAL_HWI_MEAN
+    workability = np.clip(adjusted, 0.0, 10.0)
+
+    quiet = labels["noise"] == "quiet"
+    balanced_noise = (noise >= 6.0) & (noise <= 8.5)
+    spacious = (labels["seating"] == "comfortable") | (capacity >= 7.5)
+
+    results: List[Dict] = []
+    for i in range(cafes):
+        amenities = {}
+        for factor, field, _, _ in _QUALITY_BANDS:
+            amenities[factor] = {field: str(labels[factor][i]), "score": float(scores[i, _COL[factor]])}
+        amenities["outlets"] = {
+            "available": bool(outlets_available[i]),
+            "score": float(scores[i, outlet_col]),
+        }
+        amenities = {factor: amenities[factor] for factor in FACTORS}
+        factor_counts = {factor: int(counts[i, _COL[factor]]) for factor in FACTORS}
+
+        metrics = {
+            "functional": {
+                "score": round(float(functional[i]), 2),
+                "components": {
+                    "wifi": round(float(wifi[i]), 2),
+                    "seating": round(float(seating[i]), 2),
+                    "outlets": round(float(outlets[i]), 2),
+                    "capacity": round(float(capacity[i]), 2),
+                    "drinks": round(float(drinks[i]), 2),
+                },
+            },
+            "atmospheric": {
+                "score": round(float(atmospheric[i]), 2),
+                "components": {
+                    "reputation": round(float(reputation[i]), 2),
+                    "noise": round(float(noise[i]), 2),
+                    "lighting": round(float(lighting[i]), 2),
+                },
+            },
+            "confidence": {
+                "reviewsAnalyzed": int(review_counts[i]),
+                "smoothingConstant": SMOOTHING_K,
+                "globalMean": GLOBAL_HWI_MEAN,
+                "rawScore": round(float(raw[i]), 2),
+                "factorMentions": factor_counts,
+            },
+        }
+
+        tags = {"Laptop-Friendly", "Study-Friendly"}
+        if amenities["wifi"]["quality"] in {"excellent", "good"}:
+            tags.add("Fast Wi-Fi")
+        if outlets_available[i]:
+            tags.add("Many Outlets")
+        if quiet[i]:
+            tags.add("Quiet")
+        if balanced_noise[i]:
+            tags.add("Balanced Noise")
+        if spacious[i]:
+            tags.add("Spacious")
+        if drinks[i] >= 7.5:
+            tags.add("Great Coffee")
+        if lighting[i] >= 7.0:
+            tags.add("Well-Lit")
+
+        results.append(
+            {
+                "amenities": amenities,
+                "factor_counts": factor_counts,
+                "metrics": metrics,
+                "tags": tags,
+                "workability_score": round(float(workability[i]), 2),
+            }
+        )
+    return results
@@ -16,21 +16,54 @@ See README.md for setup instructions.
 from __future__ import annotations
 
 import argparse
+import atexit
+import hashlib
+import json
+import multiprocessing
 import os
+import random
+import re
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from urllib.parse import urlparse
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 import math
 
 import requests
+from requests.adapters import HTTPAdapter
 from pymongo import MongoClient
 from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from dotenv import load_dotenv
 
+from entity_resolution import EntityIndex
+from http_cache import DEFAULT_MAX_BYTES, ResponseCache
+from indexes import SAMPLE_CITY_KEY, city_key, ensure_indexes, verify_indexes
+from journal import RunJournal, journal_path, new_run_id
+from metrics import RunMetrics, RunProfiler, profile_path
+from models import Candidate, Review, Sentiment
+from persistence import CafeEntry, MongoBulkWriter, OutputSink
+from pipeline import bounded_stage, drain_chunks
+from ratelimit import HourlyBudget, RateLimiter
+from refresh import (
+    DEFAULT_API_BUDGET,
+    DEFAULT_MIN_AGE_HOURS,
+    DEFAULT_REFRESH_WORKERS,
+    RefreshScheduler,
+    review_velocity,
+)
+from review_dedupe import review_clusters
+from scoring import score_cafes
+from sentiment_cache import SentimentCache
+from sinks import open_sink
+from tiling import DEFAULT_MAX_TILES, BoundingBox, discover, parse_bounds
+
 load_dotenv()
 
 vader = SentimentIntensityAnalyzer()
@@ -38,8 +71,30 @@ vader = SentimentIntensityAnalyzer()
 GOOGLE_PLACES_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
 YELP_API_KEY = os.getenv("YELP_API_KEY")
 DEFAULT_MAX_RESULTS = 30
-GLOBAL_HWI_MEAN = 6.8
-SMOOTHING_K = 8
+DEFAULT_CONCURRENCY = 8
+# Cafés analysed, scored and written together as one unit of the post-merge pipeline
+PIPELINE_CHUNK_SIZE = 50
+# Finished chunks allowed to wait between pipeline stages before the producer blocks
+PIPELINE_QUEUE_DEPTH = 2
+# Requests per second allowed per provider, shared by every worker of a run
+DEFAULT_RATE_LIMITS = {"google": 10.0, "yelp": 5.0}
+# Bump whenever analyze_review_sentiment would score the same text differently
+SENTIMENT_ANALYZER_VERSION = "1"
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+# A provider takes (city, max_results) and returns normalised candidates (dicts are converted)
+ProviderFn = Callable[[str, int], List[Candidate]]
+
+# Google requires a short delay before a next_page_token becomes valid
+GOOGLE_PAGE_TOKEN_DELAY = 2.0
+# (connect, read) timeout in seconds for provider requests
+REQUEST_TIMEOUT = (5.0, 15.0)
+# Extra attempts for throttled, transient or failed provider requests
+DEFAULT_MAX_RETRIES = 4
+# Full-jitter exponential backoff: sleep up to base * 2**attempt seconds, capped
+RETRY_BACKOFF_BASE = 0.5
+RETRY_BACKOFF_CAP = 30.0
+# Google statuses that mean "slow down" rather than "this request is wrong"
+GOOGLE_THROTTLE_STATUSES = {"OVER_QUERY_LIMIT", "RESOURCE_EXHAUSTED"}
 
 # Keywords to filter obvious restaurants that are unlikely to be laptop-friendly cafés
 RESTAURANT_KEYWORDS = {
@@ -68,21 +123,421 @@ RESTAURANT_KEYWORDS = {
 }
 
 CAFE_KEYWORDS = {"cafe", "coffee", "espresso", "tea", "roaster", "latte"}
+# Google types and Yelp category aliases that mark a place as a café
+CAFE_TYPES = {"cafe", "coffee_shop", "coffee", "coffeeroasteries", "cafes"}
+
+# Substrings that tie a sentence to each workability factor, in output order
+FACTOR_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "wifi": ("wifi", "wi-fi", "internet", "connection", "network", "signal"),
+    "outlets": ("outlet", "plug", "charging", "power", "socket", "usb"),
+    "seating": ("seat", "table", "chair", "desk", "booth", "stool"),
+    "capacity": ("space", "room", "crowded", "busy", "packed", "line", "seats", "tables"),
+    "drinks": ("coffee", "latte", "drink", "espresso", "tea", "matcha", "pour-over", "americano"),
+    "lighting": ("light", "lighting", "sunlight", "window", "bright", "dim", "dark", "natural light"),
+    "noise": ("noise", "loud", "quiet", "silent", "peaceful", "music", "blaring", "echo"),
+}
+
+
+def _build_factor_matcher(
+    factor_keywords: Dict[str, Tuple[str, ...]]
+) -> Tuple["re.Pattern[str]", Dict[str, frozenset]]:
+    """Compile every keyword into one pattern that reports a match at each start position.
+
+    The lookahead makes matches zero-width so overlapping keywords are all visited, and
+    longest-first alternation returns the longest keyword at a position. Every shorter keyword
+    starting there is a prefix of it, so each keyword maps to the factors of all its prefixes.
+    """
+    keywords = sorted(
+        {kw for kws in factor_keywords.values() for kw in kws}, key=lambda kw: (-len(kw), kw)
+    )
+    pattern = re.compile("(?=(" + "|".join(re.escape(kw) for kw in keywords) + "))")
+    factors_for = {
+        kw: frozenset(
+            factor
+            for factor, kws in factor_keywords.items()
+            if any(kw.startswith(prefix) for prefix in kws)
+        )
+        for kw in keywords
+    }
+    return pattern, factors_for
+
+
+_FACTOR_PATTERN, _FACTORS_FOR_KEYWORD = _build_factor_matcher(FACTOR_KEYWORDS)
+
+
+def _polarity(text: str) -> float:
+    return (vader.polarity_scores(text)["compound"] + TextBlob(text).sentiment.polarity) / 2
+
+
+def analyze_text(text: str) -> Sentiment:
+    """Return sentiment scores focused on holistic workability signals.
+
+    Sentences (split on ".") are tagged with every factor they mention in a single scan. A
+    factor's score is the polarity of its sentences joined together, and identical joined texts
+    (including the full review) are scored only once.
+    """
+    text = text or ""
+    sentences = text.split(".")
+    factor_sentences: Dict[str, List[str]] = {}
+    for sentence in sentences:
+        tags: Set[str] = set()
+        for match in _FACTOR_PATTERN.finditer(sentence.lower()):
+            tags.update(_FACTORS_FOR_KEYWORD[match.group(1)])
+        for factor in tags:
+            factor_sentences.setdefault(factor, []).append(sentence)
+
+    scored: Dict[str, float] = {}
+
+    def score(snippet: str) -> float:
+        if snippet not in scored:
+            scored[snippet] = _polarity(snippet)
+        return scored[snippet]
+
+    factors: Dict[str, float] = {}
+    keywords_found: List[str] = []
+    for factor in FACTOR_KEYWORDS:
+        matched = factor_sentences.get(factor)
+        if matched:
+            factors[factor] = score(" ".join(matched))
+            keywords_found.append(factor)
+        else:
+            factors[factor] = 0.0
+    return Sentiment(overall=score(text), keywords=keywords_found, **factors)
+
+
+# Below this many texts, worker start-up and IPC cost more than a process pool saves
+SENTIMENT_POOL_MIN_BATCH = 256
+
+_sentiment_pool: Optional[ProcessPoolExecutor] = None
+_sentiment_pool_workers = 0
+_sentiment_pool_lock = threading.Lock()
+
+
+def _init_sentiment_worker() -> None:
+    # VADER is built at import; TextBlob loads its lexicon on first use, so do that up front
+    TextBlob("warm up").sentiment
+
+
+def _analyze_chunk(texts: List[str]) -> List[Sentiment]:
+    return [analyze_text(text) for text in texts]
+
+
+def _shutdown_sentiment_pool() -> None:
+    global _sentiment_pool
+    if _sentiment_pool is not None:
+        _sentiment_pool.shutdown(cancel_futures=True)
+        _sentiment_pool = None
+
+
+def _get_sentiment_pool(workers: int) -> ProcessPoolExecutor:
+    global _sentiment_pool, _sentiment_pool_workers
+    with _sentiment_pool_lock:
+        if _sentiment_pool is None or _sentiment_pool_workers != workers:
+            _shutdown_sentiment_pool()
+            # Spawned rather than forked: the parent holds MongoClient and HTTP pool threads
+            _sentiment_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_sentiment_worker,
+            )
+            _sentiment_pool_workers = workers
+        return _sentiment_pool
+
+
+atexit.register(_shutdown_sentiment_pool)
+
+
+def analyze_reviews_batch(
+    texts: List[str], workers: Optional[int] = None, chunk_size: Optional[int] = None
+) -> List[Sentiment]:
+    """Run analyze_text over many texts, spreading the work over a process pool.
+
+    Small batches (or ``workers <= 1``) run in-process. Otherwise texts are sent in chunks,
+    by default about four per worker, so each IPC round trip carries a meaningful amount of
+    NLP work. Results come back in input order.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) < SENTIMENT_POOL_MIN_BATCH:
+        return _analyze_chunk(texts)
+    chunk_size = chunk_size or max(16, math.ceil(len(texts) / (workers * 4)))
+    chunks = [texts[start : start + chunk_size] for start in range(0, len(texts), chunk_size)]
+    results: List[Sentiment] = []
+    for chunk_result in _get_sentiment_pool(workers).map(_analyze_chunk, chunks):
+        results.extend(chunk_result)
+    return results
 
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def candidate_fingerprint(candidate: Candidate) -> str:
+    """Hash everything that feeds a café document, so unchanged cafés can skip NLP and writes.
+
+    Reviews contribute their id, rating and a hash of their text; the analyzer version is
+    included so a scoring change invalidates every stored fingerprint.
+    """
+    reviews = sorted(
+        (
+            review.source_id or "",
+            review.rating,
+            hashlib.sha1((review.text or "").encode("utf-8")).hexdigest(),
+        )
+        for review in candidate.reviews
+    )
+    payload = {
+        "analyzer": SENTIMENT_ANALYZER_VERSION,
+        "fields": {
+            field: getattr(candidate, field)
+            for field in (
+                "name",
+                "address",
+                "city",
+                "neighborhood",
+                "lat",
+                "lng",
+                "phone",
+                "website",
+                "hours",
+                "price_level",
+                "rating_sources",
+                "review_counts",
+                "google_maps_id",
+                "yelp_id",
+            )
+        },
+        "types": sorted(candidate.types),
+        "sources": sorted(candidate.sources),
+        "reviews": reviews,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
 class CafeScraper:
     """Scrapes cafés and updates MongoDB."""
 
-    def __init__(self, mongo_uri: Optional[str] = None):
+    def __init__(
+        self,
+        mongo_uri: Optional[str] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate_limits: Optional[Dict[str, RateLimiter]] = None,
+        response_cache: Optional[ResponseCache] = None,
+        replay: bool = False,
+        cache_reads: bool = True,
+        sentiment_cache: Optional[SentimentCache] = None,
+        nlp_workers: Optional[int] = None,
+        incremental: bool = False,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        tiled: bool = False,
+        max_tiles: int = DEFAULT_MAX_TILES,
+        metrics: Optional[RunMetrics] = None,
+        sink: Optional[OutputSink] = None,
+        journal: Optional[RunJournal] = None,
+        api_budget: Optional[HourlyBudget] = None,
+    ):
         self.mongo_uri = mongo_uri or os.getenv("MONGODB_URI", "mongodb://localhost:27017/lattelink")
         self.google_api_key = GOOGLE_PLACES_API_KEY
         self.yelp_api_key = YELP_API_KEY
-        self.session = requests.Session()
-        self.db = self._connect_db()
+        self.concurrency = max(1, concurrency)
+        # Stage timers, API/cache/DB counters and latency histograms for this process
+        self.metrics = metrics or RunMetrics()
+        self.rate_limits = dict(rate_limits or {})
+        self.max_retries = max(0, max_retries)
+        # Cap on provider requests per hour across every provider (the refresh daemon's budget)
+        self.api_budget = api_budget
+        # Search the city tile by tile instead of with one capped query per provider
+        self.tiled = tiled
+        self.max_tiles = max(1, max_tiles)
+        self._bounds: Dict[str, Optional[BoundingBox]] = {}
+        self._bounds_lock = threading.Lock()
+        self.response_cache = response_cache
+        # Replay serves recorded payloads only and never touches the network
+        self.replay = replay
+        if replay and response_cache is None:
+            raise ValueError("replay mode requires a response cache")
+        # Without cache reads every request goes out and only its response is cached, so
+        # the refresh daemon sees what the providers return now
+        self.cache_reads = cache_reads
+        if replay and not cache_reads:
+            raise ValueError("replay mode needs cache reads")
+        # Without a durable store this still memoises repeated texts within the process
+        self.sentiment_cache = sentiment_cache or SentimentCache(None, SENTIMENT_ANALYZER_VERSION)
+        self.nlp_workers = nlp_workers
+        # Diff against stored cafés instead of rewriting the whole city
+        self.incremental = incremental
+        # Records fetches and finished documents so an interrupted run can be resumed
+        self.journal = journal
+        self.session = self._build_session()
+        # Per-provider cap on in-flight requests, shared by every fetch path on this scraper
+        self.provider_slots = {
+            "google": threading.BoundedSemaphore(self.concurrency),
+            "yelp": threading.BoundedSemaphore(self.concurrency),
+        }
+        self.providers: Dict[str, ProviderFn] = {}
+        self.register_provider("google", self.scrape_google_places)
+        self.register_provider("yelp", self.scrape_yelp)
+        if sink is None:
+            self.db = self._connect_db()
+            with self.metrics.timer("db_round_trip_seconds", collection="cafes", op="create_indexes"):
+                ensure_indexes(self.db)
+            sink = MongoBulkWriter(self.db, self.metrics)
+        else:
+            # File sinks stage a run without a database
+            self.db = None
+        if incremental and not sink.supports_sync:
+            raise ValueError("incremental mode needs a sink with stored cafés to diff against (MongoDB)")
+        self.sink = sink
+
+    def register_provider(self, name: str, scrape: ProviderFn) -> None:
+        """Add a candidate source; providers run concurrently and merge in registration order."""
+        self.providers[name] = scrape
+        self.provider_slots.setdefault(name, threading.BoundedSemaphore(self.concurrency))
+        # Unpaced providers still share throttling pauses between their threads
+        self.rate_limits.setdefault(name, RateLimiter(0))
+
+    def _build_session(self) -> requests.Session:
+        # Size the connection pool so concurrent fetches reuse sockets instead of discarding them
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.concurrency)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _provider_request(
+        self,
+        provider: str,
+        endpoint: str,
+        url: str,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        not_before: Optional[float] = None,
+    ) -> Tuple[int, Dict]:
+        """GET a provider endpoint through the response cache and return ``(status, payload)``.
+
+        ``not_before`` is a ``time.monotonic()`` deadline that only applies when the request
+        actually goes out over the network; cache hits are returned immediately.
+        """
+        cache = self.response_cache
+        ttl_key = f"{provider}:{endpoint}"
+        key = ResponseCache.make_key(provider, endpoint, url, params) if cache is not None else None
+        if cache is not None and self.cache_reads:
+            cached = cache.get(key, ttl_key, allow_stale=self.replay)
+            if cached is not None:
+                self.metrics.count("cache_lookups_total", provider=provider, endpoint=endpoint, result="hit")
+                return cached
+            self.metrics.count("cache_lookups_total", provider=provider, endpoint=endpoint, result="miss")
+            if self.replay:
+                return 504, {"status": "REPLAY_MISS", "error_message": "not in response cache"}
+
+        if not_before is not None and not_before > time.monotonic():
+            time.sleep(not_before - time.monotonic())
+
+        limiter = self.rate_limits[provider]
+        attempt = 0
+        while True:
+            error: Optional[requests.RequestException] = None
+            if self.api_budget is not None:
+                with self.metrics.timer("api_budget_wait_seconds", provider=provider):
+                    self.api_budget.acquire()
+            with self.provider_slots[provider]:
+                with self.metrics.timer("rate_limit_wait_seconds", provider=provider):
+                    limiter.acquire()
+                try:
+                    with self.metrics.timer("http_request_seconds", provider=provider, endpoint=endpoint):
+                        resp = self.session.get(url, params=params, headers=headers, timeout=REQUEST_TIMEOUT)
+                except requests.RequestException as exc:
+                    error = exc
+            self.metrics.count(
+                "http_requests_total",
+                provider=provider,
+                endpoint=endpoint,
+                status="error" if error is not None else resp.status_code,
+            )
+            if error is None:
+                try:
+                    payload = resp.json()
+                except ValueError:
+                    payload = {}
+                status = resp.status_code
+                retry = self._retry_reason(provider, endpoint, params, status, payload)
+                if retry is None:
+                    limiter.succeeded()
+                    break
+            else:
+                retry = "transient"
+            if attempt >= self.max_retries:
+                if error is not None:
+                    raise error
+                break
+
+            self.metrics.count("http_retries_total", provider=provider, reason=retry)
+            backoff = random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2**attempt))
+            if retry == "throttled":
+                pause = limiter.throttled(self._retry_after(resp))
+                print(
+                    f"⏳ {provider} {endpoint} throttled; pausing {pause:.1f}s "
+                    f"(now {limiter.rate:g} req/s)"
+                )
+                # The shared pause holds every caller; jitter keeps them from resuming in lockstep
+                backoff = pause + backoff
+            time.sleep(backoff)
+            attempt += 1
+
+        if cache is not None and self._is_cacheable(provider, status, payload):
+            cache.put(key, ttl_key, status, payload)
+        return status, payload
+
+    def _retry_reason(
+        self, provider: str, endpoint: str, params: Optional[Dict], status: int, payload: Dict
+    ) -> Optional[str]:
+        """Classify a response as "throttled", "transient" (retry as-is) or final (``None``)."""
+        if status == 429:
+            return "throttled"
+        if status >= 500 or status == 408:
+            return "transient"
+        if provider == "google":
+            google_status = payload.get("status")
+            if google_status in GOOGLE_THROTTLE_STATUSES:
+                return "throttled"
+            if google_status == "UNKNOWN_ERROR":
+                return "transient"
+            # A next_page_token is rejected until Google has finished preparing the page
+            if (
+                google_status == "INVALID_REQUEST"
+                and endpoint == "textsearch"
+                and "pagetoken" in (params or {})
+            ):
+                return "transient"
+        return None
+
+    @staticmethod
+    def _retry_after(resp: requests.Response) -> Optional[float]:
+        """Seconds requested by a Retry-After header, given either as a delay or an HTTP date."""
+        value = resp.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _is_gone(self, provider: str, status: int, payload: Dict) -> bool:
+        """Whether a details response says the place no longer exists, not that the request failed."""
+        if provider == "google":
+            return status == 200 and payload.get("status") == "NOT_FOUND"
+        return status == 404
+
+    def _is_cacheable(self, provider: str, status: int, payload: Dict) -> bool:
+        if status != 200:
+            return False
+        if provider == "google":
+            return payload.get("status") in {"OK", "ZERO_RESULTS"}
+        return True
 
     def _connect_db(self):
         try:
@@ -108,221 +563,100 @@ class CafeScraper:
     # Sentiment + scoring helpers
     # ------------------------------------------------------------------
 
-    def analyze_review_sentiment(self, text: str) -> Dict:
+    def analyze_review_sentiment(self, text: str) -> Sentiment:
         """Return sentiment scores focused on holistic workability signals."""
-        text = text or ""
-        text_lower = text.lower()
-
-        wifi_keywords = ["wifi", "wi-fi", "internet", "connection", "network", "signal"]
-        outlet_keywords = ["outlet", "plug", "charging", "power", "socket", "usb"]
-        seating_keywords = ["seat", "table", "chair", "desk", "booth", "stool"]
-        capacity_keywords = ["space", "room", "crowded", "busy", "packed", "line", "seats", "tables"]
-        drinks_keywords = ["coffee", "latte", "drink", "espresso", "tea", "matcha", "pour-over", "americano"]
-        lighting_keywords = ["light", "lighting", "sunlight", "window", "bright", "dim", "dark", "natural light"]
-        noise_keywords = ["noise", "loud", "quiet", "silent", "peaceful", "music", "blaring", "echo"]
-
-        vader_score = vader.polarity_scores(text)["compound"]
-        blob_score = TextBlob(text).sentiment.polarity
-        overall = (vader_score + blob_score) / 2
-
-        def factor_score(keywords: List[str]) -> Optional[float]:
-            if not any(kw in text_lower for kw in keywords):
-                return None
-            sentences = [s for s in text.split(".") if any(kw in s.lower() for kw in keywords)]
-            if not sentences:
-                return None
-            factor_text = " ".join(sentences)
-            v = vader.polarity_scores(factor_text)["compound"]
-            b = TextBlob(factor_text).sentiment.polarity
-            return (v + b) / 2
-
-        wifi_score = factor_score(wifi_keywords)
-        outlet_score = factor_score(outlet_keywords)
-        seating_score = factor_score(seating_keywords)
-        capacity_score = factor_score(capacity_keywords)
-        drinks_score = factor_score(drinks_keywords)
-        lighting_score = factor_score(lighting_keywords)
-        noise_score = factor_score(noise_keywords)
-
-        keywords_found: List[str] = []
-        for key, score in [
-            ("wifi", wifi_score),
-            ("outlets", outlet_score),
-            ("seating", seating_score),
-            ("capacity", capacity_score),
-            ("drinks", drinks_score),
-            ("lighting", lighting_score),
-            ("noise", noise_score),
-        ]:
-            if score is not None:
-                keywords_found.append(key)
-
-        return {
-            "overall": overall,
-            "wifi": wifi_score if wifi_score is not None else 0.0,
-            "outlets": outlet_score if outlet_score is not None else 0.0,
-            "seating": seating_score if seating_score is not None else 0.0,
-            "capacity": capacity_score if capacity_score is not None else 0.0,
-            "drinks": drinks_score if drinks_score is not None else 0.0,
-            "lighting": lighting_score if lighting_score is not None else 0.0,
-            "noise": noise_score if noise_score is not None else 0.0,
-            "keywords": keywords_found,
-        }
-
-    def score_amenities(self, reviews: List[Dict]) -> Tuple[Dict, Dict[str, int]]:
-        """Aggregate sentiment into amenity scores and return factor mention counts."""
-        default_summary = {
-            "wifi": {"quality": "unknown", "score": 5.0},
-            "outlets": {"available": False, "score": 5.0},
-            "seating": {"type": "unknown", "score": 5.0},
-            "capacity": {"level": "unknown", "score": 5.0},
-            "drinks": {"quality": "unknown", "score": 5.0},
-            "lighting": {"quality": "unknown", "score": 5.0},
-            "noise": {"level": "unknown", "score": 5.0},
-        }
-        default_counts = {
-            "wifi": 0,
-            "outlets": 0,
-            "seating": 0,
-            "capacity": 0,
-            "drinks": 0,
-            "lighting": 0,
-            "noise": 0,
-        }
-
-        if not reviews:
-            return default_summary, default_counts
-
-        def safe_value(value: Optional[float]) -> float:
-            if value is None or not isinstance(value, (int, float)) or math.isnan(value):
-                return 0.0
-            return float(value)
-
-        wifi_scores: List[float] = []
-        outlet_scores: List[float] = []
-        seating_scores: List[float] = []
-        capacity_scores: List[float] = []
-        drinks_scores: List[float] = []
-        lighting_scores: List[float] = []
-        noise_scores: List[float] = []
-        outlet_positive_mentions = 0
-        factor_counts = dict(default_counts)
-
-        for review in reviews:
-            sentiment = review.get("sentiment", {})
-            keywords = set(sentiment.get("keywords", []))
-
-            if "wifi" in keywords:
-                wifi_scores.append(safe_value(sentiment.get("wifi")))
-                factor_counts["wifi"] += 1
-
-            if "outlets" in keywords:
-                score = safe_value(sentiment.get("outlets"))
-                outlet_scores.append(score)
-                factor_counts["outlets"] += 1
-                if score > 0:
-                    outlet_positive_mentions += 1
-
-            if "seating" in keywords:
-                seating_scores.append(safe_value(sentiment.get("seating")))
-                factor_counts["seating"] += 1
-
-            if "capacity" in keywords:
-                capacity_scores.append(safe_value(sentiment.get("capacity")))
-                factor_counts["capacity"] += 1
-
-            if "drinks" in keywords:
-                drinks_scores.append(safe_value(sentiment.get("drinks")))
-                factor_counts["drinks"] += 1
-
-            if "lighting" in keywords:
-                lighting_scores.append(safe_value(sentiment.get("lighting")))
-                factor_counts["lighting"] += 1
-
-            if "noise" in keywords:
-                noise_scores.append(safe_value(sentiment.get("noise")))
-                factor_counts["noise"] += 1
-
-        def to_score(value: float) -> float:
-            return max(0.0, min(10.0, (value + 1) * 5))
-
-        def wifi_quality(avg: float) -> str:
-            if avg > 0.35:
-                return "excellent"
-            if avg > 0.05:
-                return "good"
-            if avg > -0.25:
-                return "spotty"
-            return "poor"
-
-        def seating_quality(avg: float) -> str:
-            if avg > 0.35:
-                return "comfortable"
-            if avg > 0.05:
-                return "adequate"
-            return "limited"
-
-        def noise_quality(avg: float) -> str:
-            if avg > 0.35:
-                return "quiet"
-            if avg > -0.25:
-                return "moderate"
-            return "loud"
-
-        def capacity_level(avg: float) -> str:
-            if avg > 0.35:
-                return "ample"
-            if avg > 0.1:
-                return "roomy"
-            if avg > -0.25:
-                return "cozy"
-            return "tight"
-
-        def drinks_quality(avg: float) -> str:
-            if avg > 0.4:
-                return "excellent"
-            if avg > 0.1:
-                return "good"
-            if avg > -0.25:
-                return "average"
-            return "poor"
-
-        def lighting_quality(avg: float) -> str:
-            if avg > 0.35:
-                return "bright"
-            if avg > -0.2:
-                return "balanced"
-            return "dim"
-
-        wifi_avg = sum(wifi_scores) / len(wifi_scores) if wifi_scores else 0.0
-        outlet_avg = sum(outlet_scores) / len(outlet_scores) if outlet_scores else 0.0
-        seating_avg = sum(seating_scores) / len(seating_scores) if seating_scores else 0.0
-        capacity_avg = sum(capacity_scores) / len(capacity_scores) if capacity_scores else 0.0
-        drinks_avg = sum(drinks_scores) / len(drinks_scores) if drinks_scores else 0.0
-        lighting_avg = sum(lighting_scores) / len(lighting_scores) if lighting_scores else 0.0
-        noise_avg = sum(noise_scores) / len(noise_scores) if noise_scores else 0.0
-
-        amenities_summary = {
-            "wifi": {"quality": wifi_quality(wifi_avg), "score": to_score(wifi_avg)},
-            "outlets": {
-                "available": outlet_positive_mentions >= 2,
-                "score": to_score(outlet_avg),
-            },
-            "seating": {"type": seating_quality(seating_avg), "score": to_score(seating_avg)},
-            "capacity": {"level": capacity_level(capacity_avg), "score": to_score(capacity_avg)},
-            "drinks": {"quality": drinks_quality(drinks_avg), "score": to_score(drinks_avg)},
-            "lighting": {"quality": lighting_quality(lighting_avg), "score": to_score(lighting_avg)},
-            "noise": {"level": noise_quality(noise_avg), "score": to_score(noise_avg)},
-        }
-
-        return amenities_summary, factor_counts
+        return analyze_text(text)
+
+    def analyze_reviews(self, texts: List[str]) -> List[Sentiment]:
+        """Sentiment for each text, only running NLP on texts missing from the cache."""
+        results = self.sentiment_cache.get_many(texts)
+        missing = list(dict.fromkeys(text for text, found in zip(texts, results) if found is None))
+        fresh = dict(zip(missing, analyze_reviews_batch(missing, workers=self.nlp_workers)))
+        self.sentiment_cache.put_many(fresh.items())
+        self.metrics.count("reviews_total", len(texts))
+        self.metrics.count("reviews_analyzed_total", len(missing))
+        return [found if found is not None else fresh[text] for text, found in zip(texts, results)]
+
+    def attach_sentiment(self, review_lists: List[List[Review]]) -> List[List[Sentiment]]:
+        """Analyse each café's distinct reviews and attach the sentiment to every copy.
+
+        Near-duplicates within a café (see review_dedupe) are analysed once: every copy gets
+        the first copy's sentiment, and the later ones are marked ``is_duplicate`` and get
+        ``duplicate_of`` set to the first copy's source id (``None`` when it has none). Returns
+        one sentiment per distinct review for each café, which is what scoring should count.
+        """
+        clusters = [
+            review_clusters(
+                [review.text for review in reviews],
+                sources=[review.source for review in reviews],
+                authors=[review.author for review in reviews],
+            )
+            for reviews in review_lists
+        ]
+        # One analyze_reviews call per chunk keeps NLP batches large enough for the pool
+        sentiments = iter(
+            self.analyze_reviews(
+                [
+                    reviews[cluster[0]].text
+                    for reviews, cafe_clusters in zip(review_lists, clusters)
+                    for cluster in cafe_clusters
+                ]
+            )
+        )
+        sentiment_lists: List[List[Sentiment]] = []
+        duplicates = 0
+        for reviews, cafe_clusters in zip(review_lists, clusters):
+            distinct: List[Sentiment] = []
+            for first, *copies in cafe_clusters:
+                sentiment = next(sentiments)
+                reviews[first].sentiment = sentiment
+                reviews[first].duplicate_of = None
+                reviews[first].is_duplicate = False
+                for index in copies:
+                    reviews[index].sentiment = sentiment
+                    reviews[index].duplicate_of = reviews[first].source_id
+                    reviews[index].is_duplicate = True
+                distinct.append(sentiment)
+                duplicates += len(copies)
+            sentiment_lists.append(distinct)
+        self.metrics.count("reviews_duplicate_total", duplicates)
+        return sentiment_lists
+
+    def score_amenities(self, reviews: List[Review]) -> Tuple[Dict, Dict[str, int]]:
+        """Aggregate sentiment into amenity scores and return factor mention counts.
+
+        Near-duplicate reviews are counted once. Reviews without sentiment go through
+        ``attach_sentiment`` first; reviews that already have it reuse its ``is_duplicate``
+        marks instead of being clustered again.
+        """
+        if any(review.sentiment is None for review in reviews):
+            [sentiments] = self.attach_sentiment([reviews])
+        else:
+            sentiments = [review.sentiment for review in reviews if not review.is_duplicate]
+        [score] = score_cafes([sentiments], [None])
+        return score["amenities"], score["factor_counts"]
+
+    def score_city(
+        self, candidates: List[Candidate], sentiment_lists: List[List[Sentiment]]
+    ) -> List[Dict]:
+        """Score every candidate in one vectorised pass; see scoring.score_cafes."""
+        ratings = [self.resolve_rating(candidate) for candidate in candidates]
+        return score_cafes(sentiment_lists, ratings)
+
+    def resolve_rating(self, cafe_data: Candidate) -> float:
+        overall_rating = self.compute_overall_rating(cafe_data.rating_sources)
+        if overall_rating is None:
+            overall_rating = cafe_data.rating
+        if overall_rating is None:
+            overall_rating = 3.5
+        return overall_rating
 
     # ------------------------------------------------------------------
     # External API consumers
     # ------------------------------------------------------------------
 
-    def scrape_google_places(self, city: str, max_results: int) -> List[Dict]:
-        if not self.google_api_key:
+    def scrape_google_places(self, city: str, max_results: int) -> List[Candidate]:
+        if not self.google_api_key and not self.replay:
             print("⚠️  GOOGLE_PLACES_API_KEY not set. Skipping Google data.")
             return []
 
@@ -333,67 +667,182 @@ class CafeScraper:
             "key": self.google_api_key,
         }
 
-        places: List[Dict] = []
-        while len(places) < max_results and params:
-            resp = self.session.get(url, params=params, timeout=15)
-            data = resp.json()
-            if data.get("status") not in {"OK", "ZERO_RESULTS"}:
-                print(f"⚠️  Google Places error: {data.get('status')} {data.get('error_message','')}")
-                break
+        places: List[Candidate] = []
+        page_ready: Optional[float] = None
+        # Place ids already queued for Details in this scrape
+        seen: Set[str] = set()
+        tiled_hits = self._discover_google_places(city) if self.tiled else None
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            if tiled_hits is not None:
+                self._collect_google_places(executor, tiled_hits, seen, places, max_results)
+                params = None
+            while len(places) < max_results and params:
+                _, data = self._provider_request(
+                    "google", "textsearch", url, params=params, not_before=page_ready
+                )
+                if data.get("status") not in {"OK", "ZERO_RESULTS"}:
+                    print(f"⚠️  Google Places error: {data.get('status')} {data.get('error_message','')}")
+                    break
 
-            for result in data.get("results", []):
-                details = self.fetch_google_details(result.get("place_id"))
-                if not details:
-                    continue
-                candidate = self.normalize_google_place(details)
-                if candidate and not self.should_skip_candidate(candidate):
-                    places.append(candidate)
-                    if len(places) >= max_results:
-                        break
+                next_token = data.get("next_page_token")
+                # Details fetches below count towards the page-token delay
+                page_ready = time.monotonic() + GOOGLE_PAGE_TOKEN_DELAY
 
-            next_token = data.get("next_page_token")
-            if len(places) >= max_results or not next_token:
-                break
-            # Google requires a short delay before using the next_page_token
-            time.sleep(2)
-            params = {"pagetoken": next_token, "key": self.google_api_key}
+                self._collect_google_places(executor, data.get("results", []), seen, places, max_results)
+
+                if len(places) >= max_results or not next_token:
+                    break
+                params = {"pagetoken": next_token, "key": self.google_api_key}
 
         print(f"✅ Google Places returned {len(places)} cafés for {city}")
         return places
 
-    def fetch_google_details(self, place_id: Optional[str]) -> Optional[Dict]:
+    def _collect_google_places(
+        self,
+        executor: ThreadPoolExecutor,
+        hits: List[Dict],
+        seen: Set[str],
+        places: List[Candidate],
+        max_results: int,
+    ) -> None:
+        # Places whose reviews haven't changed get a Details call without the reviews field
+        stored = self.unchanged_reviews("google", hits)
+        self._collect_candidates(
+            "google",
+            self.prefilter_search_hits("google", hits, seen),
+            lambda place_id: executor.submit(
+                self.fetch_google_details, place_id, place_id not in stored
+            ).result,
+            lambda details: self._with_stored_reviews(
+                self.normalize_google_place(details), details.get("place_id"), stored
+            ),
+            places,
+            max_results,
+        )
+
+    # ------------------------------------------------------------------
+    # Tiled discovery
+    # ------------------------------------------------------------------
+
+    def city_bounds(self, city: str) -> Optional[BoundingBox]:
+        """Bounding box of ``city`` from the Google Geocoding API, memoised per scraper."""
+        with self._bounds_lock:
+            if city in self._bounds:
+                return self._bounds[city]
+            bounds = None
+            if self.google_api_key or self.replay:
+                _, payload = self._provider_request(
+                    "google",
+                    "geocode",
+                    "https://maps.googleapis.com/maps/api/geocode/json",
+                    params={"address": city, "key": self.google_api_key},
+                )
+                results = payload.get("results") or [{}]
+                geometry = results[0].get("geometry", {})
+                bounds = parse_bounds(geometry.get("bounds") or geometry.get("viewport"))
+            if bounds is None:
+                print(f"⚠️  Could not find bounds for {city}; using a single search per provider")
+            self._bounds[city] = bounds
+            return bounds
+
+    def _discover_google_places(self, city: str) -> Optional[List[Dict]]:
+        """Nearby Search results for the whole city, one per place, in discovery order."""
+        bounds = self.city_bounds(city)
+        if bounds is None:
+            return None
+        url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
+        hits: Dict[str, Dict] = {}
+
+        def search(tile: BoundingBox) -> Tuple[List[str], bool]:
+            lat, lng = tile.center
+            params = {
+                "location": f"{lat:.6f},{lng:.6f}",
+                "radius": min(50000, max(1, int(tile.radius_m()))),
+                "type": "cafe",
+                "key": self.google_api_key,
+            }
+            _, data = self._provider_request("google", "nearbysearch", url, params=params)
+            if data.get("status") not in {"OK", "ZERO_RESULTS"}:
+                return [], False
+            results = data.get("results", [])
+            for result in results:
+                hits.setdefault(result.get("place_id"), result)
+            # A next page means this tile holds more places than one response returns
+            return [result.get("place_id") for result in results], bool(data.get("next_page_token"))
+
+        place_ids = discover(bounds, search, max_tiles=self.max_tiles, workers=self.concurrency)
+        print(f"🗺️  Google tiled discovery found {len(place_ids)} places in {city}")
+        return [hits[place_id] for place_id in place_ids]
+
+    def _discover_yelp_businesses(self, city: str) -> Optional[List[Dict]]:
+        """Yelp search results for the whole city, one per business, in discovery order."""
+        bounds = self.city_bounds(city)
+        if bounds is None:
+            return None
+        url = "https://api.yelp.com/v3/businesses/search"
+        headers = {"Authorization": f"Bearer {self.yelp_api_key}"}
+        hits: Dict[str, Dict] = {}
+
+        def search(tile: BoundingBox) -> Tuple[List[str], bool]:
+            lat, lng = tile.center
+            params = {
+                "term": "coffee shop",
+                "latitude": round(lat, 6),
+                "longitude": round(lng, 6),
+                "radius": min(40000, max(1, int(tile.radius_m()))),
+                "limit": 50,
+                "categories": "coffee,coffeeroasteries,cafes",
+            }
+            status, payload = self._provider_request("yelp", "search", url, params=params, headers=headers)
+            if status != 200:
+                return [], False
+            businesses = payload.get("businesses", [])
+            for business in businesses:
+                hits.setdefault(business.get("id"), business)
+            return [business.get("id") for business in businesses], payload.get("total", 0) > len(
+                businesses
+            )
+
+        business_ids = discover(bounds, search, max_tiles=self.max_tiles, workers=self.concurrency)
+        print(f"🗺️  Yelp tiled discovery found {len(business_ids)} businesses in {city}")
+        return [hits[business_id] for business_id in business_ids]
+
+    def fetch_google_details(self, place_id: Optional[str], include_reviews: bool = True) -> Optional[Dict]:
         if not place_id:
             return None
+        _, payload = self._google_details_request(place_id, include_reviews)
+        if payload.get("status") != "OK":
+            return None
+        return payload.get("result")
+
+    def _google_details_request(self, place_id: str, include_reviews: bool = True) -> Tuple[int, Dict]:
         url = "https://maps.googleapis.com/maps/api/place/details/json"
+        fields = [
+            "place_id",
+            "name",
+            "formatted_address",
+            "formatted_phone_number",
+            "website",
+            "geometry/location",
+            "types",
+            "opening_hours/weekday_text",
+            "rating",
+            "user_ratings_total",
+            "price_level",
+            "reviews",
+            "address_components",
+        ]
+        if not include_reviews:
+            fields.remove("reviews")
         params = {
             "place_id": place_id,
-            "fields": ",".join(
-                [
-                    "place_id",
-                    "name",
-                    "formatted_address",
-                    "formatted_phone_number",
-                    "website",
-                    "geometry/location",
-                    "types",
-                    "opening_hours/weekday_text",
-                    "rating",
-                    "user_ratings_total",
-                    "price_level",
-                    "reviews",
-                    "address_components",
-                ]
-            ),
+            "fields": ",".join(fields),
             "reviews_no_translations": "true",
             "key": self.google_api_key,
         }
-        resp = self.session.get(url, params=params, timeout=15)
-        payload = resp.json()
-        if payload.get("status") != "OK":
-            return None
-        return payload.get("result")
+        return self._provider_request("google", "details", url, params=params)
 
-    def normalize_google_place(self, result: Dict) -> Optional[Dict]:
+    def normalize_google_place(self, result: Dict) -> Optional[Candidate]:
         geometry = result.get("geometry", {}).get("location", {})
         lat, lng = geometry.get("lat"), geometry.get("lng")
         if lat is None or lng is None:
@@ -408,66 +857,78 @@ class CafeScraper:
             if not text:
                 continue
             reviews.append(
-                {
-                    "source": "google",
-                    "source_id": f"google_{result.get('place_id')}_{review.get('time')}",
-                    "author": review.get("author_name"),
-                    "rating": review.get("rating"),
-                    "text": text,
-                    "date": datetime.fromtimestamp(review.get("time", 0)),
-                    "url": review.get("author_url"),
-                }
+                Review(
+                    source="google",
+                    source_id=f"google_{result.get('place_id')}_{review.get('time')}",
+                    author=review.get("author_name"),
+                    rating=review.get("rating"),
+                    text=text,
+                    date=datetime.fromtimestamp(review.get("time", 0)),
+                    url=review.get("author_url"),
+                )
             )
 
-        return {
-            "name": result.get("name", ""),
-            "address": address,
-            "city": self.extract_city(result.get("address_components", [])),
-            "neighborhood": neighborhood,
-            "lat": lat,
-            "lng": lng,
-            "phone": result.get("formatted_phone_number"),
-            "website": result.get("website"),
-            "hours": self.format_hours(result.get("opening_hours", {}).get("weekday_text")),
-            "types": set(result.get("types", [])),
-            "price_level": result.get("price_level"),
-            "rating_sources": {"google": result.get("rating")},
-            "review_counts": {"google": result.get("user_ratings_total")},
-            "google_maps_id": result.get("place_id"),
-            "yelp_id": None,
-            "sources": {"google"},
-            "reviews": reviews,
-        }
+        return Candidate(
+            name=result.get("name", ""),
+            address=address,
+            city=self.extract_city(result.get("address_components", [])),
+            neighborhood=neighborhood,
+            lat=lat,
+            lng=lng,
+            phone=result.get("formatted_phone_number"),
+            website=result.get("website"),
+            hours=self.format_hours(result.get("opening_hours", {}).get("weekday_text")),
+            types=set(result.get("types", [])),
+            price_level=result.get("price_level"),
+            rating_sources={"google": result.get("rating")},
+            review_counts={"google": result.get("user_ratings_total")},
+            google_maps_id=result.get("place_id"),
+            sources={"google"},
+            reviews=reviews,
+        )
 
-    def scrape_yelp(self, city: str, max_results: int) -> List[Dict]:
-        if not self.yelp_api_key:
+    def scrape_yelp(self, city: str, max_results: int) -> List[Candidate]:
+        if not self.yelp_api_key and not self.replay:
             print("⚠️  YELP_API_KEY not set. Skipping Yelp data.")
             return []
 
         headers = {"Authorization": f"Bearer {self.yelp_api_key}"}
-        params = {
-            "term": "coffee shop",
-            "location": city,
-            "limit": min(max_results, 50),
-            "categories": "coffee,coffeeroasteries,cafes",
-            "sort_by": "rating",
-        }
-        resp = self.session.get(
-            "https://api.yelp.com/v3/businesses/search", headers=headers, params=params, timeout=15
-        )
-        payload = resp.json()
-        businesses = payload.get("businesses", [])
-        cafes: List[Dict] = []
+        businesses = self._discover_yelp_businesses(city) if self.tiled else None
+        if businesses is None:
+            params = {
+                "term": "coffee shop",
+                "location": city,
+                "limit": min(max_results, 50),
+                "categories": "coffee,coffeeroasteries,cafes",
+                "sort_by": "rating",
+            }
+            _, payload = self._provider_request(
+                "yelp", "search", "https://api.yelp.com/v3/businesses/search", params=params, headers=headers
+            )
+            businesses = payload.get("businesses", [])
+        business_ids = self.prefilter_search_hits("yelp", businesses)
+        # Businesses whose reviews haven't changed skip the reviews call
+        stored = self.unchanged_reviews("yelp", businesses)
+        cafes: List[Candidate] = []
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+
+            def submit(business_id: str) -> Callable[[], Optional[Dict]]:
+                # Business and reviews calls are independent, so issue both up front
+                business_future = executor.submit(self._fetch_yelp_business, business_id)
+                if business_id in stored:
+                    return lambda: self._attach_yelp_reviews(business_future.result(), [])
+                reviews_future = executor.submit(self._fetch_yelp_reviews, business_id)
+                return lambda: self._attach_yelp_reviews(
+                    business_future.result(), reviews_future.result()
+                )
 
-        for business in businesses:
-            details = self.fetch_yelp_details(business.get("id"))
-            if not details:
-                continue
-            candidate = self.normalize_yelp_business(details)
-            if candidate and not self.should_skip_candidate(candidate):
-                cafes.append(candidate)
-                if len(cafes) >= max_results:
-                    break
+            def normalize(business: Dict) -> Optional[Candidate]:
+                return self._with_stored_reviews(
+                    self.normalize_yelp_business(business), business.get("id"), stored
+                )
+
+            self._collect_candidates("yelp", business_ids, submit, normalize, cafes, max_results)
 
         print(f"✅ Yelp returned {len(cafes)} cafés for {city}")
         return cafes
@@ -475,24 +936,39 @@ class CafeScraper:
     def fetch_yelp_details(self, business_id: Optional[str]) -> Optional[Dict]:
         if not business_id:
             return None
+        data = self._fetch_yelp_business(business_id)
+        if data is None:
+            return None
+        return self._attach_yelp_reviews(data, self._fetch_yelp_reviews(business_id))
+
+    def _fetch_yelp_business(self, business_id: str) -> Optional[Dict]:
+        status, payload = self._yelp_business_request(business_id)
+        if status != 200:
+            return None
+        return payload
+
+    def _yelp_business_request(self, business_id: str) -> Tuple[int, Dict]:
         headers = {"Authorization": f"Bearer {self.yelp_api_key}"}
-        resp = self.session.get(
-            f"https://api.yelp.com/v3/businesses/{business_id}", headers=headers, timeout=15
+        return self._provider_request(
+            "yelp", "business", f"https://api.yelp.com/v3/businesses/{business_id}", headers=headers
         )
-        if resp.status_code != 200:
-            return None
-        data = resp.json()
 
-        reviews_resp = self.session.get(
-            f"https://api.yelp.com/v3/businesses/{business_id}/reviews", headers=headers, timeout=15
+    def _fetch_yelp_reviews(self, business_id: str) -> List[Dict]:
+        headers = {"Authorization": f"Bearer {self.yelp_api_key}"}
+        status, payload = self._provider_request(
+            "yelp", "reviews", f"https://api.yelp.com/v3/businesses/{business_id}/reviews", headers=headers
         )
-        if reviews_resp.status_code == 200:
-            data["reviews_payload"] = reviews_resp.json().get("reviews", [])
-        else:
-            data["reviews_payload"] = []
+        if status != 200:
+            return []
+        return payload.get("reviews", [])
+
+    def _attach_yelp_reviews(self, data: Optional[Dict], reviews: List[Dict]) -> Optional[Dict]:
+        if data is None:
+            return None
+        data["reviews_payload"] = reviews
         return data
 
-    def normalize_yelp_business(self, business: Dict) -> Optional[Dict]:
+    def normalize_yelp_business(self, business: Dict) -> Optional[Candidate]:
         coordinates = business.get("coordinates", {})
         lat, lng = coordinates.get("latitude"), coordinates.get("longitude")
         if lat is None or lng is None:
@@ -510,38 +986,67 @@ class CafeScraper:
             except Exception:
                 review_date = _now()
             reviews.append(
-                {
-                    "source": "yelp",
-                    "source_id": f"yelp_{review.get('id')}",
-                    "author": review.get("user", {}).get("name"),
-                    "rating": review.get("rating"),
-                    "text": text,
-                    "date": review_date,
-                    "url": review.get("url"),
-                }
+                Review(
+                    source="yelp",
+                    source_id=f"yelp_{review.get('id')}",
+                    author=review.get("user", {}).get("name"),
+                    rating=review.get("rating"),
+                    text=text,
+                    date=review_date,
+                    url=review.get("url"),
+                )
             )
 
         types = {cat.get("alias") for cat in business.get("categories", []) if cat.get("alias")}
 
-        return {
-            "name": business.get("name", ""),
-            "address": address,
-            "city": business.get("location", {}).get("city"),
-            "neighborhood": (business.get("location", {}).get("neighborhoods") or [None])[0],
-            "lat": lat,
-            "lng": lng,
-            "phone": business.get("display_phone"),
-            "website": business.get("url"),
-            "hours": self.format_yelp_hours(business.get("hours", [])),
-            "types": types,
-            "price_level": len(business.get("price", "") or ""),
-            "rating_sources": {"yelp": business.get("rating")},
-            "review_counts": {"yelp": business.get("review_count")},
-            "google_maps_id": None,
-            "yelp_id": business.get("id"),
-            "sources": {"yelp"},
-            "reviews": reviews,
-        }
+        return Candidate(
+            name=business.get("name", ""),
+            address=address,
+            city=business.get("location", {}).get("city"),
+            neighborhood=(business.get("location", {}).get("neighborhoods") or [None])[0],
+            lat=lat,
+            lng=lng,
+            phone=business.get("display_phone"),
+            website=business.get("url"),
+            hours=self.format_yelp_hours(business.get("hours", [])),
+            types=types,
+            price_level=len(business.get("price", "") or ""),
+            rating_sources={"yelp": business.get("rating")},
+            review_counts={"yelp": business.get("review_count")},
+            yelp_id=business.get("id"),
+            sources={"yelp"},
+            reviews=reviews,
+        )
+
+    def gather_candidates(
+        self, city: str, max_results: int, failures: Optional[List[str]] = None
+    ) -> List[List[Candidate]]:
+        """Run every registered provider at once and return their results in registration order.
+
+        Names of providers that raised are appended to ``failures`` when given. Providers that
+        still return dicts have them converted to ``Candidate`` objects.
+        """
+        if not self.providers:
+            return []
+        results: Dict[str, List[Candidate]] = {}
+        with ThreadPoolExecutor(max_workers=len(self.providers)) as executor:
+            futures = {
+                executor.submit(scrape, city, max_results): name
+                for name, scrape in self.providers.items()
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = [
+                        candidate if isinstance(candidate, Candidate) else Candidate.from_dict(candidate)
+                        for candidate in future.result()
+                    ]
+                except Exception as exc:
+                    print(f"⚠️  {name} provider failed for {city}: {exc}")
+                    results[name] = []
+                    if failures is not None:
+                        failures.append(name)
+        return [results[name] for name in self.providers]
 
     # ------------------------------------------------------------------
     # Normalisation / dedupe helpers
@@ -586,10 +1091,71 @@ class CafeScraper:
                 return comp.get("long_name")
         return None
 
-    def should_skip_candidate(self, candidate: Dict) -> bool:
+    def _collect_candidates(
+        self,
+        provider: str,
+        ids: Iterable[Optional[str]],
+        submit: Callable[[str], Callable[[], Optional[Dict]]],
+        normalize: Callable[[Dict], Optional[Candidate]],
+        results: List[Candidate],
+        max_results: int,
+    ) -> None:
+        """Fan out detail fetches and append accepted candidates to ``results`` in input order.
+
+        ``submit`` starts a fetch and returns a callable that blocks for its payload. At most
+        ``max(concurrency, remaining)`` fetches are in flight, so a nearly-full result list does
+        not trigger a whole page of Details requests that would be thrown away. With a run
+        journal, payloads recorded by an earlier attempt are reused instead of fetched again.
+        """
+        pending: deque = deque()
+        id_iter = iter([item for item in ids if item])
+
+        def refill() -> None:
+            window = max(self.concurrency, max_results - len(results))
+            while len(pending) < window:
+                item = next(id_iter, None)
+                if item is None:
+                    return
+                pending.append(self._journaled_fetch(provider, item, submit))
+
+        refill()
+        while pending and len(results) < max_results:
+            details = pending.popleft()()
+            if details:
+                candidate = normalize(details)
+                if candidate and not self.should_skip_candidate(candidate):
+                    results.append(candidate)
+            refill()
+
+    def _journaled_fetch(
+        self, provider: str, item: str, submit: Callable[[str], Callable[[], Optional[Dict]]]
+    ) -> Callable[[], Optional[Dict]]:
+        if self.journal is None:
+            return submit(item)
+        recorded = self.journal.fetched(provider, item)
+        if recorded is not None:
+            self.metrics.count("journal_fetches_reused_total", provider=provider)
+            return lambda: recorded
+        fetch = submit(item)
+
+        def fetch_and_record() -> Optional[Dict]:
+            payload = fetch()
+            # Failed fetches are not recorded, so a resumed run tries them again
+            if payload is not None:
+                self.journal.record_fetch(provider, item, payload)
+            return payload
+
+        return fetch_and_record
+
+    def should_skip_candidate(self, candidate: Candidate) -> bool:
         """Heuristics to avoid restaurants or primarily food venues."""
-        name = candidate.get("name", "").lower()
-        types = {t.lower() for t in candidate.get("types", set()) if t}
+        return self._looks_like_restaurant(
+            candidate.name, candidate.types, yelp_only=candidate.sources == {"yelp"}
+        )
+
+    def _looks_like_restaurant(self, name: str, types: Iterable[str], yelp_only: bool) -> bool:
+        name = name.lower()
+        types = {t.lower() for t in types if t}
 
         if any(keyword in name for keyword in RESTAURANT_KEYWORDS) and not any(
             kw in name for kw in CAFE_KEYWORDS
@@ -599,254 +1165,250 @@ class CafeScraper:
         if "restaurant" in types and not ({"cafe", "coffee_shop"} & types):
             return True
 
-        if candidate.get("sources") == {"yelp"}:
+        if yelp_only:
             categories = types
             if categories and not ({"coffee", "coffeeroasteries", "cafes"} & categories):
                 return True
 
         return False
 
-    def merge_candidates(self, *candidate_lists: List[Dict], max_results: int) -> List[Dict]:
-        merged: Dict[str, Dict] = {}
-
-        def key_for(candidate: Dict) -> str:
-            name = candidate.get("name", "").strip().lower()
-            address = candidate.get("address", "").strip().lower()
-            return f"{name}|{address}"
-
-        def merge(target: Dict, source: Dict):
-            target["sources"].update(source.get("sources", []))
-            target["types"].update(source.get("types", []))
-            target["reviews"].extend(source.get("reviews", []))
-
-            for field in ["phone", "website", "hours", "google_maps_id", "yelp_id", "lat", "lng", "neighborhood", "city"]:
-                if not target.get(field) and source.get(field):
-                    target[field] = source.get(field)
-
-            for field in ["price_level"]:
-                if target.get(field) is None and source.get(field) is not None:
-                    target[field] = source.get(field)
+    def prefilter_search_hits(
+        self, provider: str, hits: List[Dict], seen: Optional[Set[str]] = None
+    ) -> List[str]:
+        """Ids from search results that are worth a Details call, most promising first.
+
+        Search payloads already carry the name, types/categories, rating and review count, so
+        hits that ``should_skip_candidate`` would reject after Details are dropped here, along
+        with ids already queued (``seen`` is updated). The rest are ordered café-like first,
+        then by rating weighted by review volume, so a ``max_results`` cut keeps the best.
+        """
+        ranked = []
+        skipped = 0
+        for position, hit in enumerate(hits):
+            if provider == "yelp":
+                item = hit.get("id")
+                types = {
+                    category.get("alias") for category in hit.get("categories", []) if category.get("alias")
+                }
+                count = hit.get("review_count")
+            else:
+                item = hit.get("place_id")
+                types = set(hit.get("types", []))
+                count = hit.get("user_ratings_total")
+            if not item or (seen is not None and item in seen):
+                continue
+            name = hit.get("name") or ""
+            if self._looks_like_restaurant(name, types, yelp_only=provider == "yelp"):
+                skipped += 1
+                continue
+            if seen is not None:
+                seen.add(item)
+            cafe_like = bool(CAFE_TYPES & types) or any(kw in name.lower() for kw in CAFE_KEYWORDS)
+            weight = (hit.get("rating") or 0) * math.log1p(count or 0)
+            ranked.append((not cafe_like, -weight, position, item))
+        if skipped:
+            self.metrics.count("prefilter_skipped_total", skipped, provider=provider)
+        return [item for *_, item in sorted(ranked)]
+
+    def unchanged_reviews(self, provider: str, hits: List[Dict]) -> Dict[str, List[Review]]:
+        """Stored reviews for search hits whose review count and rating match the stored café.
+
+        Only incremental runs use this, since they treat stored cafés as the baseline. When a
+        place's count and rating are the same as in the stored ``reviewCounts`` and
+        ``ratingSources``, its reviews are assumed unchanged. The caller then skips fetching
+        them and reuses the stored ones. Costs one café and one review query per batch of hits.
+        """
+        if not self.incremental or self.db is None or not hits:
+            return {}
+        if provider == "yelp":
+            id_field, id_key, count_key = "yelpId", "id", "review_count"
+        else:
+            id_field, id_key, count_key = "googleMapsId", "place_id", "user_ratings_total"
+        observed = {
+            hit[id_key]: (hit[count_key], hit.get("rating"))
+            for hit in hits
+            if hit.get(id_key) and hit.get(count_key) is not None
+        }
+        if not observed:
+            return {}
+        projection = {"_id": 1, id_field: 1, "reviewCounts": 1, "ratingSources": 1}
+        with self.metrics.timer("db_round_trip_seconds", collection="cafes", op="find"):
+            stored = list(self.db.cafes.find({id_field: {"$in": list(observed)}}, projection))
+        matches = {
+            doc[id_field]: doc["_id"]
+            for doc in stored
+            if (
+                (doc.get("reviewCounts") or {}).get(provider),
+                (doc.get("ratingSources") or {}).get(provider),
+            )
+            == observed[doc[id_field]]
+        }
+        if not matches:
+            return {}
 
-            target["rating_sources"].update(
-                {k: v for k, v in source.get("rating_sources", {}).items() if v is not None}
+        reviews: Dict = {cafe_id: [] for cafe_id in matches.values()}
+        projection = {
+            field: 1 for field in ("cafe", "source", "sourceId", "author", "rating", "text", "date", "url")
+        }
+        with self.metrics.timer("db_round_trip_seconds", collection="reviews", op="find"):
+            stored_reviews = list(
+                self.db.reviews.find({"cafe": {"$in": list(reviews)}, "source": provider}, projection)
             )
-            target["review_counts"].update(
-                {k: v for k, v in source.get("review_counts", {}).items() if v is not None}
+        for doc in stored_reviews:
+            reviews[doc["cafe"]].append(
+                Review(
+                    source=doc.get("source", provider),
+                    source_id=doc.get("sourceId"),
+                    author=doc.get("author"),
+                    rating=doc.get("rating"),
+                    text=doc.get("text", ""),
+                    date=doc.get("date"),
+                    url=doc.get("url"),
+                )
             )
+        self.metrics.count("review_fetches_skipped_total", len(matches), provider=provider)
+        return {item: reviews[cafe_id] for item, cafe_id in matches.items()}
+
+    def _with_stored_reviews(
+        self, candidate: Optional[Candidate], item: Optional[str], stored: Dict[str, List[Review]]
+    ) -> Optional[Candidate]:
+        if candidate is not None and item in stored:
+            candidate.reviews = list(stored[item])
+        return candidate
+
+    def merge_candidates(self, *candidate_lists: List[Candidate], max_results: int) -> List[Candidate]:
+        """Merge duplicates within and across providers, best Google rating first.
+
+        Exact ``name|address`` matches merge directly; otherwise a nearby candidate with a
+        matching name (see ``EntityIndex``) is treated as the same café. The first candidate
+        seen for a café absorbs later duplicates in place (``Candidate.merge``), so review lists
+        are moved by reference instead of being copied.
+        """
+        by_key: Dict[str, Candidate] = {}
+        merged_list: List[Candidate] = []
+        index = EntityIndex()
 
         for candidates in candidate_lists:
             for candidate in candidates:
-                k = key_for(candidate)
-                if k in merged:
-                    merge(merged[k], candidate)
-                else:
-                    merged[k] = {
-                        **candidate,
-                        "types": set(candidate.get("types", set())),
-                        "sources": set(candidate.get("sources", [])),
-                        "reviews": list(candidate.get("reviews", [])),
-                        "rating_sources": dict(candidate.get("rating_sources", {})),
-                        "review_counts": dict(candidate.get("review_counts", {})),
-                    }
-
-        merged_list = list(merged.values())
-        merged_list.sort(key=lambda c: (c["rating_sources"].get("google", 0) or 0), reverse=True)
+                k = f"{candidate.name.strip().lower()}|{candidate.address.strip().lower()}"
+                target = by_key.get(k) or index.find(candidate)
+                if target is not None:
+                    target.merge(candidate)
+                    by_key.setdefault(k, target)
+                    continue
+                by_key[k] = candidate
+                merged_list.append(candidate)
+                index.add(candidate)
+
+        merged_list.sort(key=lambda c: (c.rating_sources.get("google", 0) or 0), reverse=True)
         return merged_list[:max_results]
 
     # ------------------------------------------------------------------
     # Persistence
     # ------------------------------------------------------------------
 
-    def process_cafe(self, cafe_data: Dict, reviews: List[Dict], fallback_city: str) -> None:
-        analyzed_reviews = []
-        for review in reviews:
-            sentiment = self.analyze_review_sentiment(review.get("text", ""))
-            analyzed_reviews.append({**review, "sentiment": sentiment})
-
-        amenities, factor_counts = self.score_amenities(analyzed_reviews)
-
-        def clamp_score(value: Optional[float], default: float = 5.0) -> float:
-            if value is None or not isinstance(value, (int, float)) or math.isnan(value):
-                return default
-            return max(0.0, min(10.0, float(value)))
-
-        def sigmoid_wifi(score: float) -> float:
-            clamped = clamp_score(score)
-            return 10.0 / (1.0 + math.exp(-0.5 * (clamped - 5.0)))
-
-        def gaussian_noise(score: float) -> float:
-            clamped = clamp_score(score)
-            return 10.0 * math.exp(-((clamped - 5.0) ** 2) / 10.0)
-
-        wifi_component = sigmoid_wifi(amenities["wifi"]["score"])
-        seating_component = clamp_score(amenities["seating"]["score"])
-        outlet_component = clamp_score(amenities["outlets"]["score"])
-        capacity_component = clamp_score(amenities["capacity"]["score"])
-        drinks_component = clamp_score(amenities["drinks"]["score"])
-        lighting_component = clamp_score(amenities["lighting"]["score"])
-        noise_component = gaussian_noise(amenities["noise"]["score"])
-
-        functional_score = (
-            wifi_component * 0.35
-            + seating_component * 0.25
-            + outlet_component * 0.20
-            + capacity_component * 0.10
-            + drinks_component * 0.10
-        )
-
-        overall_rating = self.compute_overall_rating(cafe_data.get("rating_sources", {}))
-        if overall_rating is None:
-            overall_rating = cafe_data.get("rating")
-        if overall_rating is None:
-            overall_rating = 3.5
-        reputation_component = clamp_score(overall_rating * 2.0, default=6.8)
-
-        atmospheric_score = (
-            reputation_component * 0.5
-            + noise_component * 0.25
-            + lighting_component * 0.25
-        )
-
-        raw_hwi = functional_score * 0.7 + atmospheric_score * 0.3
-
-        review_count = len(analyzed_reviews)
-        denominator = review_count + SMOOTHING_K
-        adjusted_hwi = (
-            (review_count / denominator) * raw_hwi
-            + (SMOOTHING_K / denominator) * GLOBAL_HWI_MEAN
-            if denominator > 0
-            else raw_hwi
-        )
-
-        workability_score = round(max(0.0, min(10.0, adjusted_hwi)), 2)
-
-        metrics = {
-            "functional": {
-                "score": round(functional_score, 2),
-                "components": {
-                    "wifi": round(wifi_component, 2),
-                    "seating": round(seating_component, 2),
-                    "outlets": round(outlet_component, 2),
-                    "capacity": round(capacity_component, 2),
-                    "drinks": round(drinks_component, 2),
-                },
-            },
-            "atmospheric": {
-                "score": round(atmospheric_score, 2),
-                "components": {
-                    "reputation": round(reputation_component, 2),
-                    "noise": round(noise_component, 2),
-                    "lighting": round(lighting_component, 2),
-                },
-            },
-            "confidence": {
-                "reviewsAnalyzed": review_count,
-                "smoothingConstant": SMOOTHING_K,
-                "globalMean": GLOBAL_HWI_MEAN,
-                "rawScore": round(raw_hwi, 2),
-                "factorMentions": factor_counts,
-            },
-        }
-
-        tags: Set[str] = {"Laptop-Friendly", "Study-Friendly"}
-        wifi_quality = amenities["wifi"]["quality"]
-        if wifi_quality in {"excellent", "good"}:
-            tags.add("Fast Wi-Fi")
-        if amenities["outlets"]["available"]:
-            tags.add("Many Outlets")
-        if amenities["noise"]["level"] == "quiet":
-            tags.add("Quiet")
-        if 6.0 <= noise_component <= 8.5:
-            tags.add("Balanced Noise")
-        if amenities["seating"]["type"] == "comfortable" or capacity_component >= 7.5:
-            tags.add("Spacious")
-        if drinks_component >= 7.5:
-            tags.add("Great Coffee")
-        if lighting_component >= 7.0:
-            tags.add("Well-Lit")
+    def process_cafe(
+        self,
+        cafe_data: Candidate,
+        reviews: List[Review],
+        fallback_city: str,
+        sentiments: Optional[List[Sentiment]] = None,
+        score: Optional[Dict] = None,
+    ) -> None:
+        entry = self.build_documents(cafe_data, reviews, fallback_city, sentiments, score)
+        self.persist_cafes([entry])
+
+    def build_documents(
+        self,
+        cafe_data: Candidate,
+        reviews: List[Review],
+        fallback_city: str,
+        sentiments: Optional[List[Sentiment]] = None,
+        score: Optional[Dict] = None,
+    ) -> CafeEntry:
+        """Build the café document and its review documents (without the café reference).
+
+        This is where the in-memory models become plain documents for the output sink.
+        ``sentiments`` holds one entry per distinct review (see ``attach_sentiment``) and is
+        only used for scoring; each review document carries its own attached sentiment.
+        """
+        if sentiments is None or any(review.sentiment is None for review in reviews):
+            [distinct] = self.attach_sentiment([reviews])
+            if sentiments is None:
+                sentiments = distinct
+        if score is None:
+            [score] = self.score_city([cafe_data], [sentiments])
 
         coordinates = {
             "type": "Point",
-            "coordinates": [cafe_data.get("lng", 0.0), cafe_data.get("lat", 0.0)],
+            "coordinates": [cafe_data.lng, cafe_data.lat],
         }
 
-        city_value = cafe_data.get("city") or fallback_city
-        neighborhood_value = cafe_data.get("neighborhood") or ""
+        city_value = cafe_data.city or fallback_city
+        neighborhood_value = cafe_data.neighborhood or ""
 
         cafe_doc = {
-            "name": cafe_data.get("name", ""),
-            "address": cafe_data.get("address", ""),
+            "name": cafe_data.name,
+            "address": cafe_data.address,
             "city": city_value,
+            "cityKey": city_key(city_value),
             "neighborhood": neighborhood_value,
             "coordinates": coordinates,
-            "amenities": amenities,
-            "metrics": metrics,
-            "tags": list(tags),
-            "googleMapsId": cafe_data.get("google_maps_id"),
-            "yelpId": cafe_data.get("yelp_id"),
-            "phone": cafe_data.get("phone"),
-            "website": cafe_data.get("website"),
-            "hours": cafe_data.get("hours", {}),
-            "priceLevel": cafe_data.get("price_level"),
-            "sources": list(cafe_data.get("sources", [])),
-            "types": list(cafe_data.get("types", set())),
-            "rating": overall_rating,
-            "ratingSources": cafe_data.get("rating_sources", {}),
-            "reviewCounts": cafe_data.get("review_counts", {}),
+            "amenities": score["amenities"],
+            "metrics": score["metrics"],
+            "tags": list(score["tags"]),
+            "googleMapsId": cafe_data.google_maps_id,
+            "yelpId": cafe_data.yelp_id,
+            "phone": cafe_data.phone,
+            "website": cafe_data.website,
+            "hours": cafe_data.hours,
+            "priceLevel": cafe_data.price_level,
+            "sources": list(cafe_data.sources),
+            "types": list(cafe_data.types),
+            "rating": self.resolve_rating(cafe_data),
+            "ratingSources": cafe_data.rating_sources,
+            "reviewCounts": cafe_data.review_counts,
             "lastUpdated": _now(),
-            "workabilityScore": workability_score,
+            "workabilityScore": score["workability_score"],
+            "contentFingerprint": candidate_fingerprint(cafe_data),
+            "retired": False,
+            "retiredAt": None,
         }
 
-        cafes_collection = self.db.cafes
-        reviews_collection = self.db.reviews
-
-        or_clauses = [{"name": cafe_doc["name"], "address": cafe_doc["address"]}]
-        if cafe_doc.get("googleMapsId"):
-            or_clauses.append({"googleMapsId": cafe_doc["googleMapsId"]})
-        if cafe_doc.get("yelpId"):
-            or_clauses.append({"yelpId": cafe_doc["yelpId"]})
-
-        existing = cafes_collection.find_one({"$or": or_clauses})
-
-        if existing:
-            cafe_id = existing["_id"]
-            reviews_collection.delete_many({"cafe": cafe_id})
-            cafes_collection.update_one({"_id": cafe_id}, {"$set": cafe_doc})
-            action_text = "Updated"
-        else:
-            result = cafes_collection.insert_one(cafe_doc)
-            cafe_id = result.inserted_id
-            action_text = "Added"
-
-        review_ids = []
-        for review in analyzed_reviews:
+        review_docs = []
+        for review in reviews:
+            sentiment_doc = review.sentiment.to_dict()
             review_doc = {
-                "cafe": cafe_id,
-                "source": review.get("source", "unknown"),
-                "sourceId": review.get("source_id"),
-                "author": review.get("author") or "Anonymous",
-                "rating": review.get("rating"),
-                "text": review.get("text", ""),
-                "sentiment": review.get("sentiment", {}),
-                "keywords": review.get("sentiment", {}).get("keywords", []),
-                "date": review.get("date", _now()),
-                "url": review.get("url"),
+                "source": review.source,
+                "sourceId": review.source_id,
+                "author": review.author or "Anonymous",
+                "rating": review.rating,
+                "text": review.text or "",
+                "sentiment": sentiment_doc,
+                "keywords": sentiment_doc["keywords"],
+                "date": review.date or _now(),
+                "url": review.url,
+                "duplicateOf": review.duplicate_of,
             }
-            if not review_doc["text"]:
-                continue
-            if review_doc["sourceId"]:
-                exists = reviews_collection.find_one(
-                    {"sourceId": review_doc["sourceId"], "cafe": cafe_id}
-                )
-                if exists:
-                    continue
-            inserted = reviews_collection.insert_one(review_doc)
-            review_ids.append(inserted.inserted_id)
-
-        if review_ids:
-            cafes_collection.update_one({"_id": cafe_id}, {"$addToSet": {"reviews": {"$each": review_ids}}})
-
-        print(f"✅ {action_text} café: {cafe_doc['name']}")
+            if review_doc["text"]:
+                review_docs.append(review_doc)
+        return cafe_doc, review_docs
+
+    def persist_cafes(self, entries: List[CafeEntry]) -> Dict:
+        """Hand cafés and reviews to the output sink in bulk and log the outcome."""
+        report = self.sink.write(entries)
+        for name, _, action in report["cafes"]:
+            print(f"✅ {action} café: {name}")
+        for batch in report["batches"]:
+            counts = ", ".join(
+                f"{key} {batch[key]}"
+                for key in ("upserted", "matched", "modified", "deleted", "written")
+                if batch.get(key)
+            )
+            print(f"🗄️  {batch['batch']}: {batch['ops']} ops ({counts or 'no changes'})")
+            for error in batch["errors"]:
+                print(f"⚠️  {batch['batch']} write error: {error}")
+        return report
 
     def compute_overall_rating(self, rating_sources: Dict[str, Optional[float]]) -> Optional[float]:
         scores = [score for score in rating_sources.values() if isinstance(score, (int, float))]
@@ -854,46 +1416,502 @@ class CafeScraper:
             return None
         return round(sum(scores) / len(scores), 2)
 
+    def _analyze_chunk(
+        self, candidates: List[Candidate]
+    ) -> Tuple[List[Candidate], List[List[Sentiment]]]:
+        with self.metrics.timer("stage_seconds", stage="analyze"):
+            sentiment_lists = self.attach_sentiment([candidate.reviews for candidate in candidates])
+        return candidates, sentiment_lists
+
+    def _document_chunk(
+        self, analyzed: Tuple[List[Candidate], List[List[Sentiment]]], fallback_city: str
+    ) -> List[CafeEntry]:
+        candidates, sentiment_lists = analyzed
+        with self.metrics.timer("stage_seconds", stage="score"):
+            scores = self.score_city(candidates, sentiment_lists)
+            return [
+                self.build_documents(
+                    candidate, candidate.reviews, fallback_city, cafe_sentiments, score
+                )
+                for candidate, cafe_sentiments, score in zip(candidates, sentiment_lists, scores)
+            ]
+
+    def sync_city(
+        self, city_filter: Dict, candidates: List[Candidate], retire_missing: bool = True
+    ) -> Tuple[List[Candidate], Dict[str, int]]:
+        """Return only candidates that are new or changed, and soft-retire vanished cafés.
+
+        Stored cafés are matched by Google id, then Yelp id, then name+address, and compared by
+        ``contentFingerprint``. Cafés in the city that no fresh candidate matched get
+        ``retired: True`` instead of being deleted, so readers never see an empty city.
+        """
+        google_ids = [c.google_maps_id for c in candidates if c.google_maps_id]
+        yelp_ids = [c.yelp_id for c in candidates if c.yelp_id]
+        clauses: List[Dict] = [city_filter]
+        if google_ids:
+            clauses.append({"googleMapsId": {"$in": google_ids}})
+        if yelp_ids:
+            clauses.append({"yelpId": {"$in": yelp_ids}})
+        projection = {
+            "googleMapsId": 1,
+            "yelpId": 1,
+            "name": 1,
+            "address": 1,
+            "cityKey": 1,
+            "contentFingerprint": 1,
+            "retired": 1,
+        }
+        with self.metrics.timer("db_round_trip_seconds", collection="cafes", op="find"):
+            stored = list(self.db.cafes.find({"$or": clauses}, projection))
+
+        by_google = {doc["googleMapsId"]: doc for doc in stored if doc.get("googleMapsId")}
+        by_yelp = {doc["yelpId"]: doc for doc in stored if doc.get("yelpId")}
+        by_name = {(doc.get("name", ""), doc.get("address", "")): doc for doc in stored}
+
+        changed: List[Candidate] = []
+        seen = set()
+        for candidate in candidates:
+            doc = (
+                by_google.get(candidate.google_maps_id)
+                or by_yelp.get(candidate.yelp_id)
+                or by_name.get((candidate.name, candidate.address))
+            )
+            if doc is not None:
+                seen.add(doc["_id"])
+                if not doc.get("retired") and doc.get("contentFingerprint") == candidate_fingerprint(
+                    candidate
+                ):
+                    continue
+            changed.append(candidate)
+
+        vanished = [
+            doc["_id"]
+            for doc in stored
+            if doc["_id"] not in seen
+            and not doc.get("retired")
+            and doc.get("cityKey") == city_filter["cityKey"]
+        ]
+        retired = 0
+        if vanished and retire_missing:
+            with self.metrics.timer("db_round_trip_seconds", collection="cafes", op="update_many"):
+                retired = self.db.cafes.update_many(
+                    {"_id": {"$in": vanished}}, {"$set": {"retired": True, "retiredAt": _now()}}
+                ).modified_count
+        print(
+            f"🔁 Incremental sync: {len(changed)} new/changed, "
+            f"{len(candidates) - len(changed)} unchanged, {retired} retired"
+        )
+        return changed, {"unchanged": len(candidates) - len(changed), "retired": retired}
+
     # ------------------------------------------------------------------
-    # Public entrypoint
+    # Refresh daemon
     # ------------------------------------------------------------------
 
-    def scrape_city(self, city: str, max_results: int = DEFAULT_MAX_RESULTS):
-        print(f"\n☕ Starting scrape for {city} (max {max_results})\n")
+    def refresh_cafe(self, stored: Dict) -> str:
+        """Re-fetch one stored café from its providers and rewrite it if anything changed.
+
+        ``stored`` is a café document with at least ``refresh.REFRESH_PROJECTION``. The result
+        is "updated" or "unchanged". It is "failed" when a provider request failed (throttling,
+        a server error, the network), so partial data never replaces stored reviews. It is
+        "missing" when a provider says the place no longer exists (Google ``NOT_FOUND``, Yelp
+        404). Yelp reviews are only fetched when the review count or rating moved (see
+        ``unchanged_reviews``). Every refresh stores the café's smoothed ``reviewVelocity``.
+        """
+        candidates: List[Candidate] = []
+        if stored.get("googleMapsId"):
+            status, payload = self._google_details_request(stored["googleMapsId"])
+            if self._is_gone("google", status, payload):
+                return "missing"
+            if payload.get("status") != "OK":
+                return "failed"
+            candidates.append(self.normalize_google_place(payload.get("result") or {}))
+        if stored.get("yelpId"):
+            status, business = self._yelp_business_request(stored["yelpId"])
+            if self._is_gone("yelp", status, business):
+                return "missing"
+            if status != 200:
+                return "failed"
+            reused = self.unchanged_reviews("yelp", [business])
+            reviews = [] if stored["yelpId"] in reused else self._fetch_yelp_reviews(stored["yelpId"])
+            candidate = self.normalize_yelp_business(self._attach_yelp_reviews(business, reviews))
+            candidates.append(self._with_stored_reviews(candidate, stored["yelpId"], reused))
+
+        # Writing what one provider still returns would drop the other provider's reviews
+        if not candidates or any(c is None or c.lat is None or c.lng is None for c in candidates):
+            return "missing"
+        merged = candidates[0]
+        for candidate in candidates[1:]:
+            merged.merge(candidate)
+
+        now = _now()
+        update = {"reviewVelocity": review_velocity(stored, merged.review_counts, now)}
+        if candidate_fingerprint(merged) == stored.get("contentFingerprint"):
+            result = "unchanged"
+            update["lastUpdated"] = now
+        else:
+            result = "updated"
+            self.process_cafe(merged, merged.reviews, stored.get("city") or "")
+        with self.metrics.timer("db_round_trip_seconds", collection="cafes", op="update_one"):
+            self.db.cafes.update_one({"_id": stored["_id"]}, {"$set": update})
+        return result
 
-        google_candidates = self.scrape_google_places(city, max_results)
-        yelp_candidates = self.scrape_yelp(city, max_results)
+    # ------------------------------------------------------------------
+    # Public entrypoint
+    # ------------------------------------------------------------------
 
-        merged_candidates = self.merge_candidates(
-            google_candidates, yelp_candidates, max_results=max_results
-        )
+    def scrape_city(self, city: str, max_results: int = DEFAULT_MAX_RESULTS) -> Dict:
+        """Scrape one city and return a summary of what was found and saved.
+
+        Documents are written as analysis finishes. With a run journal they are staged in the
+        journal instead and written in one commit at the end, so an interrupted city can be
+        resumed without redoing finished fetches and analyses. Either way, stale cafés of the
+        city are only removed after the fresh ones have been written.
+        """
+        if self.journal is not None:
+            committed = self.journal.committed(city)
+            if committed is not None:
+                print(f"⏭️  {city} was already committed by run {self.journal.run_id}")
+                return committed
+        print(f"\n☕ Starting scrape for {city} (max {max_results})\n")
+        started = time.monotonic()
+
+        failures: List[str] = []
+        with self.metrics.timer("stage_seconds", stage="fetch"):
+            provider_candidates = self.gather_candidates(city, max_results, failures)
+        with self.metrics.timer("stage_seconds", stage="merge"):
+            merged_candidates = self.merge_candidates(*provider_candidates, max_results=max_results)
+        summary = {
+            "city": city,
+            "providers": {
+                name: len(candidates)
+                for name, candidates in zip(self.providers, provider_candidates)
+            },
+            "merged": len(merged_candidates),
+            "saved": 0,
+        }
 
         if not merged_candidates:
             print("⚠️  No cafés found with current filters.")
+            summary["seconds"] = round(time.monotonic() - started, 2)
+            return summary
+
+        to_save = [
+            candidate
+            for candidate in merged_candidates
+            if candidate.lat is not None and candidate.lng is not None
+        ]
+        # An exact match on the normalised key can use an index; a case-insensitive $regex can't
+        city_filter = {"cityKey": city_key(city)}
+
+        if self.incremental:
+            # A failed provider would make its cafés look vanished, so only retire on clean runs
+            with self.metrics.timer("stage_seconds", stage="sync"):
+                to_save, sync = self.sync_city(city_filter, to_save, retire_missing=not failures)
+            summary.update(sync)
+
+        if self.journal is not None:
+            staged = self.journal.staged_fingerprints(city)
+            if staged:
+                remaining = [c for c in to_save if candidate_fingerprint(c) not in staged]
+                print(f"📒 Resuming {city}: {len(to_save) - len(remaining)} cafés already analysed")
+                to_save = remaining
+
+        # Analysis, scoring and persistence overlap chunk by chunk; each chunk is released
+        # once written, so derived review data never accumulates for the whole city
+        pending = deque(to_save)
+        del to_save, merged_candidates, provider_candidates
+        analyzed = bounded_stage(
+            drain_chunks(pending, PIPELINE_CHUNK_SIZE),
+            self._analyze_chunk,
+            maxsize=PIPELINE_QUEUE_DEPTH,
+            name=f"analyze:{city}",
+        )
+        documents = bounded_stage(
+            analyzed,
+            lambda chunk: self._document_chunk(chunk, city),
+            maxsize=PIPELINE_QUEUE_DEPTH,
+            name=f"score:{city}",
+        )
+        if self.journal is None:
+            written = self._write_city(city, documents)
+        else:
+            for entries in documents:
+                with self.metrics.timer("stage_seconds", stage="journal"):
+                    self.journal.stage(city, entries)
+            written = self._write_city(city, self.journal.staged_entries(city, PIPELINE_CHUNK_SIZE))
+
+        # A failed provider would make its cafés look stale, so only prune on clean runs
+        if self.sink.supports_sync and not self.incremental and not failures:
+            with self.metrics.timer("stage_seconds", stage="sync"):
+                self._prune_city(city, city_filter, written)
+
+        print(f"\n🎉 Scraping complete for {city}. Saved/updated {len(written)} cafés.\n")
+        summary["saved"] = len(written)
+        summary["seconds"] = round(time.monotonic() - started, 2)
+        self.metrics.observe("city_seconds", summary["seconds"])
+        if self.journal is not None:
+            self.journal.commit_city(city, summary)
+        return summary
+
+    def _write_city(self, city: str, chunks: Iterable[List[CafeEntry]]) -> List:
+        """Hand every chunk to the sink and return the ids of the written cafés."""
+        written: List = []
+        self.sink.begin_city(city)
+        try:
+            for entries in chunks:
+                with self.metrics.timer("stage_seconds", stage="persist"):
+                    written.extend(cafe_id for _, cafe_id, _ in self.persist_cafes(entries)["cafes"])
+        finally:
+            self.sink.end_city()
+        return written
+
+    def _prune_city(self, city: str, city_filter: Dict, written: List) -> None:
+        """Delete the city's stored cafés (and their reviews) that this run did not write."""
+        timer = self.metrics.timer
+        with timer("db_round_trip_seconds", collection="cafes", op="find"):
+            stale_ids = [
+                doc["_id"]
+                for doc in self.db.cafes.find({**city_filter, "_id": {"$nin": written}}, {"_id": 1})
+            ]
+        if not stale_ids:
             return
+        with timer("db_round_trip_seconds", collection="cafes", op="delete_many"):
+            removed = self.db.cafes.delete_many({"_id": {"$in": stale_ids}})
+        with timer("db_round_trip_seconds", collection="reviews", op="delete_many"):
+            self.db.reviews.delete_many({"cafe": {"$in": stale_ids}})
+        print(f"🧹 Removed {removed.deleted_count} stale cafés for {city}")
+
+
+# ----------------------------------------------------------------------
+# Multi-city batch mode
+# ----------------------------------------------------------------------
+
+# One scraper per worker process, so the MongoClient, HTTP session and NLP models are reused
+_worker_scraper: Optional[CafeScraper] = None
+# Base --profile path; each city a worker scrapes gets its own dump next to it
+_worker_profile: Optional[str] = None
+
+
+def build_scraper(options: Dict) -> CafeScraper:
+    """Create a scraper from plain, picklable options so worker processes can build their own.
+
+    SQLite handles cannot cross process boundaries, so caches are opened here from paths.
+    """
+    response_cache_path = options.get("response_cache_path")
+    sentiment_cache_path = options.get("sentiment_cache_path")
+    return CafeScraper(
+        mongo_uri=options.get("mongo_uri"),
+        concurrency=options.get("concurrency", DEFAULT_CONCURRENCY),
+        rate_limits=options.get("rate_limits"),
+        max_retries=options.get("max_retries", DEFAULT_MAX_RETRIES),
+        tiled=options.get("tiled", False),
+        max_tiles=options.get("max_tiles", DEFAULT_MAX_TILES),
+        sink=open_sink(options["output"]) if options.get("output") else None,
+        response_cache=(
+            ResponseCache(response_cache_path, max_bytes=options.get("cache_max_bytes", DEFAULT_MAX_BYTES))
+            if response_cache_path
+            else None
+        ),
+        replay=options.get("replay", False),
+        cache_reads=options.get("cache_reads", True),
+        nlp_workers=options.get("nlp_workers"),
+        incremental=options.get("incremental", False),
+        sentiment_cache=(
+            SentimentCache(sentiment_cache_path, SENTIMENT_ANALYZER_VERSION)
+            if sentiment_cache_path
+            else None
+        ),
+        journal=RunJournal(options["journal_path"]) if options.get("journal_path") else None,
+        api_budget=HourlyBudget(options["api_budget"]) if options.get("api_budget") else None,
+    )
 
-        # Remove existing cafés for this city to avoid stale seed entries
-        city_filter = {"city": {"$regex": f"^{city}$", "$options": "i"}}
-        existing_ids = list(self.db.cafes.find(city_filter, {"_id": 1}))
-        if existing_ids:
-            removed = self.db.cafes.delete_many(city_filter)
-            cafe_ids = [doc["_id"] for doc in existing_ids]
-            self.db.reviews.delete_many({"cafe": {"$in": cafe_ids}})
-            print(f"🧹 Removed {removed.deleted_count} existing cafés for {city}")
-
-        saved = 0
-        for candidate in merged_candidates:
-            if candidate.get("lat") is None or candidate.get("lng") is None:
-                continue
-            self.process_cafe(candidate, candidate.get("reviews", []), city)
-            saved += 1
 
-        print(f"\n🎉 Scraping complete for {city}. Saved/updated {saved} cafés.\n")
+def _init_batch_worker(options: Dict) -> None:
+    global _worker_scraper, _worker_profile
+    _worker_scraper = build_scraper(options)
+    _worker_profile = options.get("profile_path")
+    # TextBlob loads its lexicon lazily; pay for that once per worker rather than per city
+    TextBlob("warm up").sentiment
+
+
+def _scrape_city_job(city: str, max_results: int) -> Dict:
+    profiler = RunProfiler() if _worker_profile else None
+    if profiler:
+        profiler.start()
+    try:
+        summary = _worker_scraper.scrape_city(city, max_results=max_results)
+    except Exception as exc:
+        print(f"❌ Scrape failed for {city}: {exc}")
+        summary = {"city": city, "error": str(exc)}
+    if profiler:
+        slug = re.sub(r"[^a-z0-9]+", "-", city.lower()).strip("-") or "city"
+        profiler.stop(profile_path(_worker_profile, slug))
+    # Ship this city's counters to the parent, which merges every worker's into one report
+    summary["metrics"] = _worker_scraper.metrics.drain()
+    return summary
+
+
+def run_batch(cities: List[str], max_results: int, workers: int, options: Dict) -> List[Dict]:
+    """Scrape many cities across a process pool and return per-city summaries in input order."""
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(cities))),
+        initializer=_init_batch_worker,
+        initargs=(options,),
+    ) as executor:
+        futures = [executor.submit(_scrape_city_job, city, max_results) for city in cities]
+        return [future.result() for future in futures]
+
+
+def run_verify_indexes(args: argparse.Namespace) -> None:
+    """Explain each query shape against the configured database; exit 1 on any collection scan."""
+    scraper = build_scraper({"mongo_uri": args.mongo_uri})
+    results = verify_indexes(scraper.db, args.city)
+    key = city_key(args.city) if args.city else SAMPLE_CITY_KEY
+    print(f"🔍 Index check (city lookups explained for cityKey {key!r})")
+    for result in results:
+        mark = "✅" if result["ok"] else "❌"
+        plan = result["error"] or " > ".join(result["stages"])
+        print(f"  {mark} {result['collection']}: {result['query']} ({plan})")
+    failed = [result for result in results if not result["ok"]]
+    if failed:
+        print(f"❌ {len(failed)} of {len(results)} queries scan a whole collection or could not be planned")
+        sys.exit(1)
+    print(f"🎉 All {len(results)} queries use an index")
+
+
+def run_refresh(args: argparse.Namespace) -> None:
+    """Run the refresh daemon until interrupted, then print its metrics."""
+    cities = load_cities(args.city or args.cities, args.cities_file)
+    scraper = build_scraper(
+        {
+            "mongo_uri": args.mongo_uri,
+            "concurrency": args.concurrency,
+            "rate_limits": {"google": RateLimiter(args.google_qps), "yelp": RateLimiter(args.yelp_qps)},
+            "max_retries": args.max_retries,
+            "response_cache_path": (
+                None if args.no_cache else os.path.join(args.cache_dir, "responses.sqlite")
+            ),
+            "cache_max_bytes": args.cache_max_mb * 1024 * 1024,
+            # A cached payload can be days old; a refresh has to ask the providers again
+            "cache_reads": False,
+            "nlp_workers": args.nlp_workers or 1,
+            # Refreshes compare against the stored cafés, like an incremental run
+            "incremental": True,
+            "sentiment_cache_path": (
+                None if args.no_sentiment_cache else os.path.join(args.cache_dir, "sentiment.sqlite")
+            ),
+            "api_budget": args.api_budget,
+        }
+    )
+    city_filter = {"cityKey": {"$in": [city_key(city) for city in cities]}} if cities else None
+    scheduler = RefreshScheduler(
+        scraper,
+        workers=args.refresh_workers,
+        city_filter=city_filter,
+        min_age_hours=args.min_age_hours,
+    )
+    budget = f"{args.api_budget} requests/hour" if args.api_budget else "no API budget"
+    print(f"📅 Refreshing {', '.join(cities) if cities else 'all cities'} with {budget}")
+    started = time.monotonic()
+    scheduler.run()
+    scraper.metrics.observe("run_seconds", time.monotonic() - started)
+    print_run_metrics(scraper.metrics)
+    if args.metrics_json:
+        scraper.metrics.write_json(args.metrics_json, seconds=round(time.monotonic() - started, 2))
+        print(f"📝 Run report written to {args.metrics_json}")
+    if args.metrics_prom:
+        scraper.metrics.write_prometheus(args.metrics_prom)
+        print(f"📝 Prometheus metrics written to {args.metrics_prom}")
+
+
+def print_run_metrics(metrics: RunMetrics) -> None:
+    """One-screen rollup of where the run's time and API calls went."""
+    snapshot = metrics.snapshot()
+    cache_hits: Dict[str, float] = {}
+    for counter in snapshot["counters"]:
+        if counter["name"] == "cache_lookups_total" and counter["labels"].get("result") == "hit":
+            provider = counter["labels"]["provider"]
+            cache_hits[provider] = cache_hits.get(provider, 0) + counter["value"]
+    round_trips = sum(
+        histogram["count"]
+        for histogram in snapshot["histograms"]
+        if histogram["name"] == "db_round_trip_seconds"
+    )
+    stages = metrics.totals("stage_seconds", by="stage")
+    http_seconds = metrics.totals("http_request_seconds", by="provider")
+    waits = metrics.totals("rate_limit_wait_seconds", by="provider")
+    reviews = sum(metrics.totals("reviews_total", by="").values())
+    analyzed = sum(metrics.totals("reviews_analyzed_total", by="").values())
+    duplicates = sum(metrics.totals("reviews_duplicate_total", by="").values())
+
+    print("📊 Run metrics")
+    if stages:
+        print("  ⏱️  stages: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stages.items()))
+    providers = metrics.totals("http_requests_total", by="provider")
+    for provider in sorted(set(providers) | set(cache_hits)):
+        print(
+            f"  🌐 {provider}: {providers.get(provider, 0):g} API calls in "
+            f"{http_seconds.get(provider, 0):.2f}s (+{waits.get(provider, 0):.2f}s rate-limited), "
+            f"{cache_hits.get(provider, 0):g} cache hits"
+        )
+    if round_trips:
+        db_seconds = sum(metrics.totals("db_round_trip_seconds", by="op").values())
+        print(f"  🗄️  MongoDB: {round_trips:g} round trips in {db_seconds:.2f}s")
+    if reviews:
+        print(f"  🧠 reviews: {reviews + duplicates:g} seen, {duplicates:g} near-duplicates, {analyzed:g} analysed")
+    prefiltered = metrics.totals("prefilter_skipped_total", by="provider")
+    for provider, skipped in sorted(prefiltered.items()):
+        print(f"  🔎 {provider}: {skipped:g} search hits skipped before any details call")
+    unchanged = metrics.totals("review_fetches_skipped_total", by="provider")
+    for provider, skipped in sorted(unchanged.items()):
+        print(f"  ♻️  {provider}: reviews of {skipped:g} unchanged places reused from MongoDB")
+    refreshes = metrics.totals("refreshes_total", by="result")
+    if refreshes:
+        print("  🔄 refreshes: " + ", ".join(f"{count:g} {result}" for result, count in sorted(refreshes.items())))
+    reused = sum(metrics.totals("journal_fetches_reused_total", by="").values())
+    if reused:
+        print(f"  📒 journal: {reused:g} detail fetches reused from the interrupted attempt")
+
+
+def print_batch_summary(summaries: List[Dict], elapsed: float) -> None:
+    print("\n📊 Batch summary")
+    for summary in summaries:
+        if "error" in summary:
+            print(f"  ❌ {summary['city']}: {summary['error']}")
+            continue
+        providers = ", ".join(f"{name} {count}" for name, count in summary["providers"].items())
+        print(
+            f"  ☕ {summary['city']}: saved {summary['saved']} of {summary['merged']} merged "
+            f"({providers}) in {summary['seconds']}s"
+        )
+    saved = sum(summary.get("saved", 0) for summary in summaries)
+    failed = sum(1 for summary in summaries if "error" in summary)
+    print(
+        f"\n🎉 {len(summaries)} cities, {saved} cafés saved/updated, {failed} failed "
+        f"in {elapsed:.1f}s\n"
+    )
+
+
+def load_cities(cities_arg: Optional[str], cities_file: Optional[str]) -> List[str]:
+    """Collect cities from a comma-separated list and/or a file with one city per line."""
+    cities: List[str] = []
+    if cities_arg:
+        cities.extend(city.strip() for city in cities_arg.split(","))
+    if cities_file:
+        with open(cities_file, encoding="utf-8") as handle:
+            cities.extend(line.split("#", 1)[0].strip() for line in handle)
+    # Preserve order but drop blanks and repeats
+    return list(dict.fromkeys(city for city in cities if city))
 
 
 def main():
     parser = argparse.ArgumentParser(description="Scrape café data for Lattelink")
-    parser.add_argument("--city", type=str, required=True, help="City or region to scrape")
+    targets = parser.add_argument_group("targets (one required; optional with --refresh)")
+    targets.add_argument("--city", type=str, help="City or region to scrape")
+    targets.add_argument("--cities", type=str, help="Comma-separated cities to scrape in batch mode")
+    targets.add_argument(
+        "--cities-file", type=str, help="File with one city per line to scrape in batch mode"
+    )
     parser.add_argument(
         "--max-results",
         type=int,
@@ -901,10 +1919,260 @@ def main():
         help=f"Maximum number of cafés to process (default {DEFAULT_MAX_RESULTS})",
     )
     parser.add_argument("--mongo-uri", type=str, help="MongoDB connection URI override")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum concurrent detail requests per provider (default {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for batch mode (default: CPU count)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only rewrite new or changed cafés and soft-retire vanished ones instead of replacing the city",
+    )
+    parser.add_argument(
+        "--tiled",
+        action="store_true",
+        help="Discover cafés by searching the city's bounding box tile by tile (scales past single-query caps)",
+    )
+    parser.add_argument(
+        "--max-tiles",
+        type=int,
+        default=DEFAULT_MAX_TILES,
+        help=f"Search budget per provider for --tiled (default {DEFAULT_MAX_TILES})",
+    )
+    parser.add_argument(
+        "--nlp-workers",
+        type=int,
+        help="Processes for sentiment analysis (default: CPU count for --city, 1 per batch worker)",
+    )
+    parser.add_argument(
+        "--google-qps",
+        type=float,
+        default=DEFAULT_RATE_LIMITS["google"],
+        help=f"Google requests per second across all workers (default {DEFAULT_RATE_LIMITS['google']:g}, 0 = unlimited)",
+    )
+    parser.add_argument(
+        "--yelp-qps",
+        type=float,
+        default=DEFAULT_RATE_LIMITS["yelp"],
+        help=f"Yelp requests per second across all workers (default {DEFAULT_RATE_LIMITS['yelp']:g}, 0 = unlimited)",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=DEFAULT_MAX_RETRIES,
+        help=f"Retries for throttled or failed provider requests (default {DEFAULT_MAX_RETRIES})",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="mongo",
+        help="Where to write cafés: mongo (default), ndjson:DIR or parquet:DIR (one subdirectory per city)",
+    )
+    parser.add_argument("--metrics-json", type=str, help="Write a JSON run report with all metrics to this path")
+    parser.add_argument(
+        "--metrics-prom",
+        type=str,
+        help="Write metrics in Prometheus text format to this path (e.g. a node_exporter textfile)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        help="Write a cProfile dump of the run to this path (batch workers add one per city next to it)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=DEFAULT_CACHE_DIR,
+        help="Directory for the on-disk response and sentiment caches (default scraper/.cache)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help=f"Size budget for the response cache before LRU eviction (default {DEFAULT_MAX_BYTES // (1024 * 1024)})",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always call the provider APIs")
+    parser.add_argument(
+        "--resume",
+        type=str,
+        metavar="RUN_ID",
+        help="Resume an interrupted run from its journal (targets and --max-results come from the journal)",
+    )
+    parser.add_argument(
+        "--no-journal",
+        action="store_true",
+        help="Write cafés as they are analysed without a resumable run journal",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Run the refresh daemon: re-fetch stored cafés by staleness priority (targets optionally limit cities)",
+    )
+    parser.add_argument(
+        "--api-budget",
+        type=int,
+        default=DEFAULT_API_BUDGET,
+        help=f"Provider requests per hour for --refresh (default {DEFAULT_API_BUDGET}, 0 = unlimited)",
+    )
+    parser.add_argument(
+        "--refresh-workers",
+        type=int,
+        default=DEFAULT_REFRESH_WORKERS,
+        help=f"Cafés refreshed concurrently by --refresh (default {DEFAULT_REFRESH_WORKERS})",
+    )
+    parser.add_argument(
+        "--min-age-hours",
+        type=float,
+        default=DEFAULT_MIN_AGE_HOURS,
+        help=f"Skip cafés refreshed more recently than this in --refresh (default {DEFAULT_MIN_AGE_HOURS:g})",
+    )
+    parser.add_argument(
+        "--verify-indexes",
+        action="store_true",
+        help="Ensure the MongoDB indexes, explain() every scraper query and fail on collection scans",
+    )
+    parser.add_argument(
+        "--no-sentiment-cache",
+        action="store_true",
+        help="Re-run sentiment analysis on every review instead of reusing stored results",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Serve provider responses from the cache only, without network access",
+    )
     args = parser.parse_args()
 
-    scraper = CafeScraper(mongo_uri=args.mongo_uri)
-    scraper.scrape_city(args.city, max_results=args.max_results)
+    if args.replay and args.no_cache:
+        parser.error("--replay needs the response cache; drop --no-cache")
+    if args.city and (args.cities or args.cities_file):
+        parser.error("--city cannot be combined with --cities/--cities-file")
+    if args.resume and args.no_journal:
+        parser.error("--resume needs the run journal; drop --no-journal")
+    if args.verify_indexes:
+        run_verify_indexes(args)
+        return
+    if args.refresh:
+        if args.resume:
+            parser.error("--refresh does not use a run journal; drop --resume")
+        if args.replay:
+            parser.error("--refresh fetches live data; it cannot be combined with --replay")
+        if args.output != "mongo":
+            parser.error("--refresh updates stored cafés; it cannot be combined with a file --output")
+        run_refresh(args)
+        return
+
+    journal: Optional[RunJournal] = None
+    journal_dir = os.path.join(args.cache_dir, "runs")
+    if args.resume:
+        if args.city or args.cities or args.cities_file:
+            parser.error("--resume takes its cities from the journal; drop --city/--cities/--cities-file")
+        path = journal_path(journal_dir, args.resume)
+        if not os.path.exists(path):
+            parser.error(f"no journal for run {args.resume} in {journal_dir}")
+        journal = RunJournal(path)
+        targets = journal.get_meta("targets") or {}
+        cities, single = targets.get("cities", []), targets.get("single", False)
+        args.max_results = targets.get("max_results", args.max_results)
+    else:
+        cities = [args.city] if args.city else load_cities(args.cities, args.cities_file)
+        single = bool(args.city)
+    if not cities:
+        parser.error("one of --city, --cities or --cities-file is required")
+    try:
+        file_sink = open_sink(args.output)
+    except (ValueError, ImportError) as exc:
+        parser.error(str(exc))
+    if file_sink is not None and args.incremental:
+        parser.error("--incremental diffs against MongoDB; it cannot be combined with a file --output")
+
+    if journal is None and not args.no_journal:
+        journal = RunJournal(journal_path(journal_dir, new_run_id()))
+        journal.set_meta("targets", {"cities": cities, "single": single, "max_results": args.max_results})
+    if journal is not None:
+        print(f"📒 Run {journal.run_id} (resume with --resume {journal.run_id} if it is interrupted)")
+
+    options = {
+        "mongo_uri": args.mongo_uri,
+        "concurrency": args.concurrency,
+        "rate_limits": {"google": RateLimiter(args.google_qps), "yelp": RateLimiter(args.yelp_qps)},
+        "max_retries": args.max_retries,
+        "tiled": args.tiled,
+        "max_tiles": args.max_tiles,
+        "output": args.output,
+        "response_cache_path": (
+            None if args.no_cache else os.path.join(args.cache_dir, "responses.sqlite")
+        ),
+        "cache_max_bytes": args.cache_max_mb * 1024 * 1024,
+        "replay": args.replay,
+        "nlp_workers": args.nlp_workers,
+        "incremental": args.incremental,
+        "sentiment_cache_path": (
+            None if args.no_sentiment_cache else os.path.join(args.cache_dir, "sentiment.sqlite")
+        ),
+        "journal_path": journal.path if journal else None,
+    }
+
+    profiler = RunProfiler() if args.profile else None
+    if profiler:
+        profiler.start()
+    started_at = _now()
+    started = time.monotonic()
+    try:
+        if single:
+            scraper = build_scraper(options)
+            summaries = [scraper.scrape_city(cities[0], max_results=args.max_results)]
+            metrics = scraper.metrics
+            if scraper.journal is not None:
+                scraper.journal.close()
+        else:
+            # Batch workers already occupy the cores; don't stack an NLP pool under each one
+            if args.nlp_workers is None:
+                options["nlp_workers"] = 1
+            options["profile_path"] = args.profile
+            summaries = run_batch(cities, max_results=args.max_results, workers=args.workers, options=options)
+            metrics = RunMetrics()
+            for summary in summaries:
+                metrics.merge(summary.pop("metrics", {}))
+            print_batch_summary(summaries, time.monotonic() - started)
+    except BaseException:
+        if journal is not None:
+            print(f"💾 Run {journal.run_id} interrupted; continue it with --resume {journal.run_id}")
+        raise
+    elapsed = time.monotonic() - started
+
+    if journal is not None:
+        if any("error" in summary for summary in summaries):
+            print(f"💾 Some cities failed; retry them with --resume {journal.run_id}")
+            journal.close()
+        else:
+            # Every city is committed, so there is nothing left to resume
+            journal.remove()
+
+    if profiler:
+        profiler.stop(args.profile)
+        print(f"🔬 Profile written to {args.profile}")
+    metrics.observe("run_seconds", elapsed)
+    print_run_metrics(metrics)
+    if args.metrics_json:
+        metrics.write_json(
+            args.metrics_json,
+            started_at=started_at.isoformat(),
+            seconds=round(elapsed, 2),
+            cities=summaries,
+        )
+        print(f"📝 Run report written to {args.metrics_json}")
+    if args.metrics_prom:
+        metrics.write_prometheus(args.metrics_prom)
+        print(f"📝 Prometheus metrics written to {args.metrics_prom}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,100 @@
+"""
+Persistent memo of review sentiment results.
+
+Entries are keyed by a SHA-256 of the analyzer version plus the review text, so an edited
+review or a change to the scoring code produces a new key. A small in-process LRU sits in
+front of a SQLite table so repeated lookups within a run skip both NLP and disk.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models import Sentiment
+
+DEFAULT_LRU_SIZE = 4096
+
+
+class SentimentCache:
+    """Two-level cache of ``text -> Sentiment`` for one analyzer version.
+
+    The LRU holds ``Sentiment`` objects; SQLite stores their document form as JSON.
+    """
+
+    def __init__(self, path: Optional[str], version: str, lru_size: int = DEFAULT_LRU_SIZE):
+        self.version = version
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[str, Sentiment]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiments (key TEXT PRIMARY KEY, payload TEXT NOT NULL)"
+            )
+            self._conn.commit()
+
+    def key_for(self, text: str) -> str:
+        return hashlib.sha256(f"{self.version}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[Sentiment]]:
+        """Look up each text, returning ``None`` in the positions that still need analysis."""
+        keys = [self.key_for(text) for text in texts]
+        found: Dict[str, Sentiment] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key] = self._lru[key]
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            if missing and self._conn is not None:
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start : start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = self._conn.execute(
+                        f"SELECT key, payload FROM sentiments WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for key, payload in rows:
+                        found[key] = Sentiment.from_dict(json.loads(payload))
+                        self._remember(key, found[key])
+        return [found.get(key) for key in keys]
+
+    def put_many(self, items: Iterable[Tuple[str, Sentiment]]) -> None:
+        rows = [(self.key_for(text), sentiment) for text, sentiment in items]
+        if not rows:
+            return
+        with self._lock:
+            for key, sentiment in rows:
+                self._remember(key, sentiment)
+            if self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO sentiments VALUES (?, ?)",
+                    [
+                        (key, json.dumps(sentiment.to_dict(), separators=(",", ":")))
+                        for key, sentiment in rows
+                    ],
+                )
+                self._conn.commit()
+
+    def _remember(self, key: str, sentiment: Sentiment) -> None:
+        self._lru[key] = sentiment
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
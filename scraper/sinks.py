@@ -0,0 +1,225 @@
+"""
+Output sinks for scraped cafés and reviews.
+
+``scrape_city`` hands each finished chunk of ``(café document, review documents)`` entries
+to an ``OutputSink``. MongoDB (``persistence.MongoBulkWriter``) is the default; the file sinks
+here write a city to compact files at disk speed instead, so a region can be staged without a
+database and bulk-loaded later (NDJSON via ``mongoimport``) or read straight into analytics
+(Parquet).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from typing import Dict, List, Optional
+
+from bson import ObjectId, json_util
+
+from persistence import CafeEntry, OutputSink
+
+
+def city_slug(city: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", city.lower()).strip("-") or "city"
+
+
+def link_entries(entries: List[CafeEntry]) -> List[Dict]:
+    """Assign ids the way MongoBulkWriter would, returning linked ``(café, reviews)`` copies.
+
+    Files are meant to be loaded as-is, so each café gets an ``_id`` and a ``reviews`` id list
+    and each review its ``_id`` and ``cafe`` reference.
+    """
+    linked = []
+    for cafe_doc, review_docs in entries:
+        cafe_id = ObjectId()
+        reviews = [{"_id": ObjectId(), **review_doc, "cafe": cafe_id} for review_doc in review_docs]
+        linked.append(
+            {"cafe": {"_id": cafe_id, **cafe_doc, "reviews": [r["_id"] for r in reviews]}, "reviews": reviews}
+        )
+    return linked
+
+
+class _FileSink(OutputSink):
+    """Writes each city to ``<directory>/<city-slug>/`` as ``cafes.<ext>`` and ``reviews.<ext>``."""
+
+    extension = ""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.city_directory: Optional[str] = None
+
+    def begin_city(self, city: str) -> None:
+        self.end_city()
+        self.city_directory = os.path.join(self.directory, city_slug(city))
+        os.makedirs(self.city_directory, exist_ok=True)
+        self._open(
+            os.path.join(self.city_directory, f"cafes.{self.extension}"),
+            os.path.join(self.city_directory, f"reviews.{self.extension}"),
+        )
+
+    def write(self, entries: List[CafeEntry]) -> Dict:
+        if self.city_directory is None:
+            raise RuntimeError("begin_city() must be called before write()")
+        linked = link_entries(entries)
+        cafes = [entry["cafe"] for entry in linked]
+        reviews = [review for entry in linked for review in entry["reviews"]]
+        self._write(cafes, reviews)
+        return {
+            "cafes": [(cafe.get("name", ""), cafe["_id"], "Exported") for cafe in cafes],
+            "batches": [
+                {"batch": f"cafes.{self.extension}", "ops": len(cafes), "written": len(cafes), "errors": []},
+                {"batch": f"reviews.{self.extension}", "ops": len(reviews), "written": len(reviews), "errors": []},
+            ],
+        }
+
+    def end_city(self) -> None:
+        if self.city_directory is not None:
+            self._close()
+            self.city_directory = None
+
+    def close(self) -> None:
+        self.end_city()
+
+    def _open(self, cafes_path: str, reviews_path: str) -> None:
+        raise NotImplementedError
+
+    def _write(self, cafes: List[Dict], reviews: List[Dict]) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+
+class NdjsonSink(_FileSink):
+    """One MongoDB Extended JSON document per line, ready for ``mongoimport``."""
+
+    extension = "ndjson"
+
+    def _open(self, cafes_path: str, reviews_path: str) -> None:
+        self._files = [open(path, "w", encoding="utf-8") for path in (cafes_path, reviews_path)]
+
+    def _write(self, cafes: List[Dict], reviews: List[Dict]) -> None:
+        for handle, docs in zip(self._files, (cafes, reviews)):
+            handle.writelines(
+                json_util.dumps(doc, json_options=json_util.RELAXED_JSON_OPTIONS) + "\n" for doc in docs
+            )
+            handle.flush()
+
+    def _close(self) -> None:
+        for handle in self._files:
+            handle.close()
+
+
+class ParquetSink(_FileSink):
+    """Columnar files with one row group per written chunk (needs ``pyarrow``).
+
+    Scalars keep their types; nested documents such as ``amenities``, ``metrics`` and review
+    ``sentiment`` are stored as JSON strings so every chunk shares one schema.
+    """
+
+    extension = "parquet"
+
+    def __init__(self, directory: str):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Parquet output needs pyarrow: pip install pyarrow") from exc
+        super().__init__(directory)
+        self._pa, self._pq = pa, pq
+        timestamp = pa.timestamp("us", tz="UTC")
+        strings = pa.list_(pa.string())
+        self.cafe_columns = {
+            "_id": pa.string(),
+            "name": pa.string(),
+            "address": pa.string(),
+            "city": pa.string(),
+            "cityKey": pa.string(),
+            "neighborhood": pa.string(),
+            "lat": pa.float64(),
+            "lng": pa.float64(),
+            "googleMapsId": pa.string(),
+            "yelpId": pa.string(),
+            "phone": pa.string(),
+            "website": pa.string(),
+            "priceLevel": pa.int64(),
+            "rating": pa.float64(),
+            "workabilityScore": pa.float64(),
+            "tags": strings,
+            "sources": strings,
+            "types": strings,
+            "amenities": pa.string(),
+            "metrics": pa.string(),
+            "hours": pa.string(),
+            "ratingSources": pa.string(),
+            "reviewCounts": pa.string(),
+            "reviews": strings,
+            "contentFingerprint": pa.string(),
+            "retired": pa.bool_(),
+            "lastUpdated": timestamp,
+        }
+        self.review_columns = {
+            "_id": pa.string(),
+            "cafe": pa.string(),
+            "source": pa.string(),
+            "sourceId": pa.string(),
+            "author": pa.string(),
+            "rating": pa.float64(),
+            "text": pa.string(),
+            "sentiment": pa.string(),
+            "keywords": strings,
+            "date": timestamp,
+            "url": pa.string(),
+            "duplicateOf": pa.string(),
+        }
+
+    def _open(self, cafes_path: str, reviews_path: str) -> None:
+        pa, pq = self._pa, self._pq
+        self._writers = [
+            pq.ParquetWriter(path, pa.schema(list(columns.items())), compression="zstd")
+            for path, columns in ((cafes_path, self.cafe_columns), (reviews_path, self.review_columns))
+        ]
+
+    def _write(self, cafes: List[Dict], reviews: List[Dict]) -> None:
+        for writer, columns, docs in zip(
+            self._writers, (self.cafe_columns, self.review_columns), (cafes, reviews)
+        ):
+            if not docs:
+                continue
+            rows = [self._row(doc, columns) for doc in docs]
+            writer.write_table(self._pa.Table.from_pylist(rows, schema=writer.schema))
+
+    def _row(self, doc: Dict, columns: Dict) -> Dict:
+        coordinates = (doc.get("coordinates") or {}).get("coordinates") or [None, None]
+        values = {**doc, "lng": coordinates[0], "lat": coordinates[1]}
+        row = {}
+        for column, kind in columns.items():
+            value = values.get(column)
+            if isinstance(value, ObjectId):
+                value = str(value)
+            elif kind == self._pa.string() and isinstance(value, (dict, list)):
+                value = json.dumps(value, default=str, separators=(",", ":"))
+            elif isinstance(kind, self._pa.ListType) and value is not None:
+                value = [str(item) for item in value]
+            elif kind == self._pa.float64() and value is not None:
+                value = float(value)
+            row[column] = value
+        return row
+
+    def _close(self) -> None:
+        for writer in self._writers:
+            writer.close()
+
+
+SINKS = {"ndjson": NdjsonSink, "parquet": ParquetSink}
+
+
+def open_sink(spec: str) -> Optional[OutputSink]:
+    """Parse ``mongo`` / ``ndjson:DIR`` / ``parquet:DIR``; ``None`` means the MongoDB default."""
+    kind, _, directory = spec.partition(":")
+    if kind == "mongo" and not directory:
+        return None
+    if kind not in SINKS or not directory:
+        raise ValueError(f"unknown output {spec!r}; expected mongo, ndjson:DIR or parquet:DIR")
+    return SINKS[kind](directory)
@@ -0,0 +1,148 @@
+"""
+Refresh daemon against the benchmark fixtures: a refresh must see what the providers return
+now, not a payload the response cache stored days ago.
+
+Run from the scraper directory with ``python -m pytest tests``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import copy
+import io
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("mongomock")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), "benchmarks"))
+
+import mongomock  # noqa: E402
+
+import bench  # noqa: E402
+import refresh  # noqa: E402
+import scraper  # noqa: E402
+from http_cache import ResponseCache  # noqa: E402
+
+
+@pytest.fixture
+def fixture():
+    return copy.deepcopy(bench.load_json("cities", "small.json"))
+
+
+def make_scraper(fixture, cache_path: str, **options) -> scraper.CafeScraper:
+    instance = scraper.CafeScraper(
+        mongo_uri="mongodb://localhost/lattelink_test",
+        response_cache=ResponseCache(cache_path),
+        nlp_workers=1,
+        incremental=True,
+        **options,
+    )
+    instance.google_api_key = instance.yelp_api_key = "fixture"
+    instance.session = bench.FixtureSession(fixture)
+    return instance
+
+
+@pytest.fixture
+def scraped(fixture, tmp_path, monkeypatch):
+    """A mongomock database holding the fixture city, and the response cache it filled."""
+    client = mongomock.MongoClient()
+    # Every scraper in a test shares the one in-memory server
+    monkeypatch.setattr(scraper, "MongoClient", lambda *args, **kwargs: client)
+    monkeypatch.setattr(scraper, "GOOGLE_PAGE_TOKEN_DELAY", 0)
+    cache_path = str(tmp_path / "responses.sqlite")
+    with contextlib.redirect_stdout(io.StringIO()):
+        make_scraper(fixture, cache_path).scrape_city(fixture["city"], max_results=100)
+    return cache_path
+
+
+def _stored_google_cafe(instance: scraper.CafeScraper):
+    return instance.db.cafes.find_one({"googleMapsId": {"$ne": None}}, refresh.REFRESH_PROJECTION)
+
+
+def test_refresh_detects_changed_provider_payload(fixture, scraped):
+    instance = make_scraper(fixture, scraped, cache_reads=False)
+    stored = _stored_google_cafe(instance)
+    details = fixture["google"]["details"][stored["googleMapsId"]]["result"]
+    details["rating"] = 1.0 if details.get("rating") != 1.0 else 5.0
+    details["user_ratings_total"] = (details.get("user_ratings_total") or 0) + 25
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = instance.refresh_cafe(stored)
+
+    assert result == "updated"
+    refreshed = instance.db.cafes.find_one({"_id": stored["_id"]})
+    assert refreshed["contentFingerprint"] != stored["contentFingerprint"]
+    assert refreshed["reviewVelocity"] > 0
+    counters = instance.metrics.snapshot()["counters"]
+    assert not [c for c in counters if c["name"] == "cache_lookups_total"]
+
+
+def test_refresh_writes_fresh_responses_to_the_cache(fixture, scraped):
+    instance = make_scraper(fixture, scraped, cache_reads=False)
+    stored = _stored_google_cafe(instance)
+    fixture["google"]["details"][stored["googleMapsId"]]["result"]["rating"] = 1.0
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        instance.refresh_cafe(stored)
+
+    # A scraper that does read the cache now gets the refreshed payload
+    reader = make_scraper(fixture, scraped)
+    reader.session = None
+    assert reader.fetch_google_details(stored["googleMapsId"])["rating"] == 1.0
+
+
+def test_replay_needs_cache_reads(tmp_path):
+    with pytest.raises(ValueError):
+        scraper.CafeScraper(
+            response_cache=ResponseCache(str(tmp_path / "responses.sqlite")),
+            replay=True,
+            cache_reads=False,
+        )
+
+
+def _detail_requests(instance: scraper.CafeScraper) -> float:
+    counters = instance.metrics.snapshot()["counters"]
+    return sum(
+        c["value"] for c in counters if c["name"] == "http_requests_total" and c["labels"]["endpoint"] == "details"
+    )
+
+
+def test_closed_place_is_missing_and_not_retried(fixture, scraped):
+    instance = make_scraper(fixture, scraped, cache_reads=False)
+    stored = _stored_google_cafe(instance)
+    del fixture["google"]["details"][stored["googleMapsId"]]
+
+    scheduler = refresh.RefreshScheduler(instance, city_filter={"_id": stored["_id"]}, min_age_hours=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = scheduler.run(max_refreshes=5)
+
+    assert results == {"missing": 1}
+    assert _detail_requests(instance) == 1
+    assert scheduler.load() == 0
+
+
+def test_closed_yelp_business_is_missing(fixture, scraped):
+    instance = make_scraper(fixture, scraped, cache_reads=False)
+    stored = instance.db.cafes.find_one({"yelpId": {"$ne": None}}, refresh.REFRESH_PROJECTION)
+    del fixture["yelp"]["business"][stored["yelpId"]]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert instance.refresh_cafe(stored) == "missing"
+
+
+def test_server_error_is_failed_and_retried_later(fixture, scraped):
+    instance = make_scraper(fixture, scraped, cache_reads=False, max_retries=0)
+    stored = _stored_google_cafe(instance)
+    instance.session.get = lambda url, **kwargs: bench.FixtureResponse({}, 503)
+
+    scheduler = refresh.RefreshScheduler(instance, city_filter={"_id": stored["_id"]}, min_age_hours=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = scheduler.run(max_refreshes=5)
+
+    assert results == {"failed": 1}
+    assert stored["_id"] in scheduler._retry_at
+    assert stored["_id"] not in scheduler._missing
@@ -0,0 +1,132 @@
+"""
+Parity of ``analyze_text`` with the per-factor implementation it replaced.
+
+``baseline_analysis`` is a frozen copy of the old ``analyze_review_sentiment``, which scanned
+the review once per factor. The single-pass engine must produce the same scores and mentions.
+
+Run from the scraper directory with ``python -m pytest tests``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from textblob import TextBlob  # noqa: E402
+
+import scraper  # noqa: E402
+
+REVIEWS_PATH = os.path.join(os.path.dirname(HERE), "benchmarks", "fixtures", "reviews.json")
+
+
+def baseline_analysis(text: str) -> Dict:
+    """The pre-single-pass ``analyze_review_sentiment``, kept verbatim apart from ``self``."""
+    text = text or ""
+    text_lower = text.lower()
+
+    wifi_keywords = ["wifi", "wi-fi", "internet", "connection", "network", "signal"]
+    outlet_keywords = ["outlet", "plug", "charging", "power", "socket", "usb"]
+    seating_keywords = ["seat", "table", "chair", "desk", "booth", "stool"]
+    capacity_keywords = ["space", "room", "crowded", "busy", "packed", "line", "seats", "tables"]
+    drinks_keywords = ["coffee", "latte", "drink", "espresso", "tea", "matcha", "pour-over", "americano"]
+    lighting_keywords = ["light", "lighting", "sunlight", "window", "bright", "dim", "dark", "natural light"]
+    noise_keywords = ["noise", "loud", "quiet", "silent", "peaceful", "music", "blaring", "echo"]
+
+    vader_score = scraper.vader.polarity_scores(text)["compound"]
+    blob_score = TextBlob(text).sentiment.polarity
+    overall = (vader_score + blob_score) / 2
+
+    def factor_score(keywords: List[str]) -> Optional[float]:
+        if not any(kw in text_lower for kw in keywords):
+            return None
+        sentences = [s for s in text.split(".") if any(kw in s.lower() for kw in keywords)]
+        if not sentences:
+            return None
+        factor_text = " ".join(sentences)
+        v = scraper.vader.polarity_scores(factor_text)["compound"]
+        b = TextBlob(factor_text).sentiment.polarity
+        return (v + b) / 2
+
+    wifi_score = factor_score(wifi_keywords)
+    outlet_score = factor_score(outlet_keywords)
+    seating_score = factor_score(seating_keywords)
+    capacity_score = factor_score(capacity_keywords)
+    drinks_score = factor_score(drinks_keywords)
+    lighting_score = factor_score(lighting_keywords)
+    noise_score = factor_score(noise_keywords)
+
+    keywords_found: List[str] = []
+    for key, score in [
+        ("wifi", wifi_score),
+        ("outlets", outlet_score),
+        ("seating", seating_score),
+        ("capacity", capacity_score),
+        ("drinks", drinks_score),
+        ("lighting", lighting_score),
+        ("noise", noise_score),
+    ]:
+        if score is not None:
+            keywords_found.append(key)
+
+    return {
+        "overall": overall,
+        "wifi": wifi_score if wifi_score is not None else 0.0,
+        "outlets": outlet_score if outlet_score is not None else 0.0,
+        "seating": seating_score if seating_score is not None else 0.0,
+        "capacity": capacity_score if capacity_score is not None else 0.0,
+        "drinks": drinks_score if drinks_score is not None else 0.0,
+        "lighting": lighting_score if lighting_score is not None else 0.0,
+        "noise": noise_score if noise_score is not None else 0.0,
+        "keywords": keywords_found,
+    }
+
+
+def _fixture_reviews() -> List[str]:
+    with open(REVIEWS_PATH, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+EDGE_CASES = [
+    "",
+    "   ",
+    ".",
+    "...",
+    # "seats" is a capacity keyword and contains the seating keyword "seat"
+    "Plenty of seats. Seats fill up by noon.",
+    "seats. Seats",
+    "One outlet by the door. Outlets everywhere upstairs!",
+    "outlet outlets OUTLET",
+    # Overlapping keywords within one word and across factors
+    "Natural light from the window. Lighting is dim at night, it is dark.",
+    "The power socket near the table had no usb charging.",
+    "The wi-fi signal and internet connection dropped; network was bad",
+    "Great vibe. Friendly staff. Would come back.",
+    "Busy busy busy. Packed. Loud music, no quiet corner.",
+    "Tea! Matcha latte, pour-over and an americano; espresso too.",
+    "No trailing period and a booth",
+]
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_edge_cases_match_baseline(text):
+    assert scraper.analyze_text(text).to_dict() == baseline_analysis(text)
+
+
+def test_review_without_factors_has_no_mentions():
+    result = scraper.analyze_text("Great vibe. Friendly staff. Would come back.")
+    assert result.keywords == []
+    assert all(getattr(result, factor) == 0.0 for factor in scraper.FACTOR_KEYWORDS)
+
+
+def test_fixture_reviews_match_baseline():
+    mismatches = [
+        text for text in _fixture_reviews() if scraper.analyze_text(text).to_dict() != baseline_analysis(text)
+    ]
+    assert not mismatches
@@ -0,0 +1,133 @@
+"""
+Geo-tiled place discovery.
+
+A single provider search is capped (about 60 Google results, 50 from Yelp), so large cities
+are undercounted. The city's bounding box is cut into a grid of tiles and each tile is
+searched on its own. A tile whose search comes back saturated (more results than one call
+returns) is split into four and searched again, so dense downtowns are refined while sparse
+suburbs cost a single call. A tile budget caps the total number of searches.
+"""
+
+from __future__ import annotations
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+DEFAULT_MAX_TILES = 64
+DEFAULT_MAX_DEPTH = 6
+# Edge length of the initial grid cells before any subdivision
+INITIAL_TILE_M = 3000.0
+
+_METERS_PER_DEGREE = 111_320.0
+
+
+class BoundingBox(NamedTuple):
+    south: float
+    west: float
+    north: float
+    east: float
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        return (self.south + self.north) / 2, (self.west + self.east) / 2
+
+    def size_m(self) -> Tuple[float, float]:
+        """(height, width) in metres."""
+        lat, _ = self.center
+        height = (self.north - self.south) * _METERS_PER_DEGREE
+        width = (self.east - self.west) * _METERS_PER_DEGREE * math.cos(math.radians(lat))
+        return height, width
+
+    def radius_m(self) -> float:
+        """Radius of the circle around the centre that covers the whole box."""
+        height, width = self.size_m()
+        return math.hypot(height, width) / 2
+
+    def grid(self, cell_m: float) -> List["BoundingBox"]:
+        height, width = self.size_m()
+        rows = max(1, math.ceil(height / cell_m))
+        cols = max(1, math.ceil(width / cell_m))
+        dlat = (self.north - self.south) / rows
+        dlng = (self.east - self.west) / cols
+        return [
+            BoundingBox(
+                self.south + r * dlat,
+                self.west + c * dlng,
+                self.south + (r + 1) * dlat,
+                self.west + (c + 1) * dlng,
+            )
+            for r in range(rows)
+            for c in range(cols)
+        ]
+
+    def quarters(self) -> List["BoundingBox"]:
+        lat, lng = self.center
+        return [
+            BoundingBox(self.south, self.west, lat, lng),
+            BoundingBox(self.south, lng, lat, self.east),
+            BoundingBox(lat, self.west, self.north, lng),
+            BoundingBox(lat, lng, self.north, self.east),
+        ]
+
+
+# search(tile) -> (ids found in the tile, whether the provider had more than it returned)
+TileSearch = Callable[[BoundingBox], Tuple[Iterable[str], bool]]
+
+
+def discover(
+    bounds: BoundingBox,
+    search: TileSearch,
+    max_tiles: int = DEFAULT_MAX_TILES,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    workers: int = 4,
+) -> List[str]:
+    """Search ``bounds`` tile by tile and return unique ids in discovery order.
+
+    Tiles of one level are searched concurrently. Saturated tiles are split into quarters
+    for the next level while the budget of ``max_tiles`` searches lasts.
+    """
+    level = _initial_grid(bounds, max_tiles)
+    seen: Dict[str, None] = {}
+    spent = 0
+    depth = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while level:
+            spent += len(level)
+            saturated: List[BoundingBox] = []
+            for tile, (ids, full) in zip(level, executor.map(search, level)):
+                for item in ids:
+                    if item:
+                        seen.setdefault(item, None)
+                if full:
+                    saturated.append(tile)
+            depth += 1
+            if depth > max_depth:
+                break
+            # Refine as many saturated tiles as the remaining budget allows
+            room = (max_tiles - spent) // 4
+            level = [quarter for tile in saturated[:room] for quarter in tile.quarters()]
+    return list(seen)
+
+
+def _initial_grid(bounds: BoundingBox, max_tiles: int) -> List[BoundingBox]:
+    # Leave at least three quarters of the budget for refining dense tiles
+    cell_m = INITIAL_TILE_M
+    tiles = bounds.grid(cell_m)
+    while len(tiles) > max(1, max_tiles // 4):
+        cell_m *= 1.5
+        tiles = bounds.grid(cell_m)
+    return tiles
+
+
+def parse_bounds(viewport: Optional[Dict]) -> Optional[BoundingBox]:
+    """Build a box from a Google-style ``{"northeast": {...}, "southwest": {...}}`` viewport."""
+    if not viewport:
+        return None
+    try:
+        northeast, southwest = viewport["northeast"], viewport["southwest"]
+        return BoundingBox(
+            float(southwest["lat"]), float(southwest["lng"]), float(northeast["lat"]), float(northeast["lng"])
+        )
+    except (KeyError, TypeError, ValueError):
+        return None